@@ -1,10 +1,5 @@
-from flask import Flask, request, jsonify, render_template_string
-import requests
-import json
 import os
-from datetime import datetime
-
-app = Flask(__name__)
+from puter_app import create_app
 
 # HTML 템플릿
 HTML_TEMPLATE = """
@@ -116,6 +111,21 @@ HTML_TEMPLATE = """
                     </div>
                 </div>
                 
+                <div class="endpoint">
+                    <h4><span class="method">POST</span> /chat/batch - AI 채팅 일괄 처리</h4>
+                    <p>여러 요청을 서버에서 병렬로 처리하고 순서대로 반환합니다. <code>"stream": true</code>이면 완료 순으로 NDJSON을 전송합니다.</p>
+                    <div class="code-block">
+{
+  "requests": [
+    {"message": "안녕하세요!"},
+    {"message": "파이썬에 대해 설명해주세요"}
+  ],
+  "model": "claude-sonnet-4",
+  "max_concurrency": 16
+}
+                    </div>
+                </div>
+                
                 <div class="endpoint">
                     <h4><span class="method">GET</span> /health - 서버 상태</h4>
                     <p>서버가 정상적으로 작동하는지 확인합니다.</p>
@@ -192,108 +202,15 @@ curl -X POST https://your-app-name.herokuapp.com/chat \\
 </html>
 """
 
-class PuterAIServer:
-    """Puter AI 서버 클래스"""
-    
-    def __init__(self):
-        self.base_url = "https://api.puter.com"  # 실제 API 엔드포인트
-    
-    def chat(self, message: str, model: str = "claude-sonnet-4", 
-             system_prompt: str = None) -> dict:
-        """
-        AI 채팅 요청
-        
-        Args:
-            message: 사용자 메시지
-            model: AI 모델
-            system_prompt: 시스템 프롬프트
-            
-        Returns:
-            응답 결과
-        """
-        try:
-            # 실제 Puter API 호출 (예시)
-            # 실제 구현에서는 Puter의 공식 API를 사용해야 합니다
-            payload = {
-                "message": message,
-                "model": model
-            }
-            
-            if system_prompt:
-                payload["system_prompt"] = system_prompt
-            
-            # 여기서는 시뮬레이션 응답을 반환
-            # 실제로는 requests.post()를 사용하여 API 호출
-            return {
-                "success": True,
-                "response": f"시뮬레이션 응답: {message}에 대한 AI 답변입니다.",
-                "model": model,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
-
-# 서버 인스턴스 생성
-puter_server = PuterAIServer()
-
-@app.route('/')
-def index():
-    """메인 페이지"""
-    return render_template_string(HTML_TEMPLATE)
-
-@app.route('/chat', methods=['POST'])
-def chat():
-    """AI 채팅 API 엔드포인트"""
-    try:
-        data = request.get_json()
-        
-        if not data or 'message' not in data:
-            return jsonify({
-                "success": False,
-                "error": "메시지가 필요합니다."
-            }), 400
-        
-        message = data['message']
-        model = data.get('model', 'claude-sonnet-4')
-        system_prompt = data.get('system_prompt')
-        
-        # AI 응답 요청
-        result = puter_server.chat(message, model, system_prompt)
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
-
-@app.route('/health')
-def health():
-    """서버 상태 확인"""
-    return jsonify({
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "service": "Puter AI API Server",
-        "version": "1.0.0"
-    })
+app = create_app({
+    "backend": "simulation",
+    "service": "Puter AI API Server",
+    "version": "1.0.0",
+    "html_template": HTML_TEMPLATE
+})
 
-@app.route('/models')
-def models():
-    """사용 가능한 모델 목록"""
-    return jsonify({
-        "models": [
-            "claude-sonnet-4",
-            "claude-3-5-sonnet", 
-            "claude-3-opus",
-            "gpt-4",
-            "gpt-3.5-turbo"
-        ]
-    })
+# 서버 인스턴스 (app.extensions["puter"]와 동일)
+puter_server = app.extensions["puter"]
 
 if __name__ == '__main__':
     # Heroku에서는 PORT 환경변수를 사용
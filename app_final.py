@@ -1,92 +1,72 @@
 import sys
 import requests
 import json
-import time
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QTextEdit, QLineEdit, QPushButton, QLabel, QFileDialog, QHBoxLayout
+    QApplication, QWidget, QVBoxLayout, QLineEdit, QPushButton, QLabel, QFileDialog, QHBoxLayout
 )
 from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PIL import Image
-import base64
-import io
+from PyQt5.QtCore import Qt
 
-# Puter AI API - Socket.IO 기반 통신
-class PuterWorker(QThread):
-    result = pyqtSignal(str)
-    error = pyqtSignal(str)
+from puter_http import get_puter_http, read_chat_stream, PuterSessionError
+from puter_image import image_data_url
+from puter_chat_view import ChatView
+from puter_chat_pool import PooledWorker, get_chat_executor
 
+# Puter AI API - Socket.IO 기반 통신
+class PuterWorker(PooledWorker):
     def __init__(self, message, image_path=None):
         super().__init__()
         self.message = message
         self.image_path = image_path
 
-    def run(self):
+    def execute(self):
         try:
-            # Puter API의 실제 엔드포인트 (Socket.IO 기반)
-            api_url = "https://api.puter.com/socket.io/"
+            # 실제 채팅 API 호출 (세션 확인은 공용 클라이언트가 캐시해 두고 만료/실패 시에만 다시 수행)
+            chat_url = "https://api.puter.com/chat"
             
-            # 먼저 whoami 요청으로 세션 확인
-            whoami_url = "https://api.puter.com/whoami"
-            whoami_response = requests.get(whoami_url)
-            print(f"Whoami 응답: {whoami_response.status_code}")
+            headers = {
+                "Content-Type": "application/json",
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+            }
             
-            # Socket.IO 연결을 위한 폴링 요청
-            polling_url = f"{api_url}?EIO=4&transport=polling&t={int(time.time() * 1000)}"
-            polling_response = requests.get(polling_url)
-            print(f"Polling 응답: {polling_response.status_code}")
+            # 메시지 구성
+            content = [{"type": "text", "text": self.message}]
             
-            if polling_response.status_code == 200:
-                # 실제 채팅 API 호출
-                chat_url = "https://api.puter.com/chat"
-                
-                headers = {
-                    "Content-Type": "application/json",
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                }
-                
-                # 메시지 구성
-                content = [{"type": "text", "text": self.message}]
-                
-                # 이미지가 있는 경우 추가
-                if self.image_path:
-                    with open(self.image_path, 'rb') as img_file:
-                        img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                        content.append({
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{img_data}"
-                            }
-                        })
-                
-                data = {
-                    "model": "claude-sonnet-4",
-                    "messages": [{"role": "user", "content": content}],
-                    "max_tokens": 1000,
-                    "temperature": 0.7
-                }
-                
-                print(f"채팅 API 요청: {json.dumps(data, indent=2)}")
-                
-                chat_response = requests.post(chat_url, headers=headers, json=data, timeout=60)
+            # 이미지가 있는 경우 추가
+            if self.image_path:
+                content.append({
+                    "type": "image_url",
+                    "image_url": {
+                        "url": image_data_url(self.image_path)
+                    }
+                })
+            
+            data = {
+                "model": "claude-sonnet-4",
+                "messages": [{"role": "user", "content": content}],
+                "max_tokens": 1000,
+                "temperature": 0.7,
+                "stream": True
+            }
+            
+            print(f"채팅 API 요청: {json.dumps(data, indent=2)}")
+            
+            # stream=True로 받아 도착하는 조각을 바로 화면에 전달
+            with get_puter_http().post_with_session(chat_url, headers=headers, json=data, timeout=60,
+                                                    stream=True) as chat_response:
                 print(f"채팅 API 응답: {chat_response.status_code}")
                 
                 if chat_response.status_code == 200:
-                    result = chat_response.json()
-                    print(f"채팅 API 결과: {json.dumps(result, indent=2)}")
-                    
-                    if 'choices' in result and len(result['choices']) > 0:
-                        assistant_message = result['choices'][0]['message']['content']
-                        self.result.emit(assistant_message)
-                    else:
-                        self.error.emit("응답 형식이 올바르지 않습니다.")
+                    assistant_message = read_chat_stream(chat_response, self.chunk.emit, cancelled=self.is_cancelled)
+                    self.result.emit(assistant_message)
                 else:
                     self.error.emit(f"채팅 API 호출 실패: {chat_response.status_code} - {chat_response.text}")
-            else:
-                self.error.emit(f"Socket.IO 연결 실패: {polling_response.status_code}")
-                
+        except PuterSessionError as e:
+            self.error.emit(str(e))
         except requests.exceptions.RequestException as e:
             self.error.emit(f"네트워크 오류: {str(e)}")
+        except ValueError as e:
+            self.error.emit(str(e))
         except Exception as e:
             self.error.emit(f"오류: {str(e)}")
 
@@ -95,6 +75,10 @@ class ChatBot(QWidget):
         super().__init__()
         self.messages = []
         self.image_path = None
+        # 요청은 공용 스레드 풀에서 실행 (창마다 하나의 대화)
+        self.executor = get_chat_executor()
+        # 스트리밍 중인 AI 응답 메시지
+        self.streaming_message = None
         self.init_ui()
         
     def init_ui(self):
@@ -104,8 +88,7 @@ class ChatBot(QWidget):
         layout = QVBoxLayout()
         
         # 채팅 히스토리 표시 영역
-        self.chat_display = QTextEdit()
-        self.chat_display.setReadOnly(True)
+        self.chat_display = ChatView()
         layout.addWidget(QLabel('대화 내용:'))
         layout.addWidget(self.chat_display)
         
@@ -181,22 +164,42 @@ class ChatBot(QWidget):
         # 입력 필드 초기화
         self.input_field.clear()
         
-        # API 호출
-        self.worker = PuterWorker(message, self.image_path)
-        self.worker.result.connect(self.handle_response)
-        self.worker.error.connect(self.handle_error)
-        self.worker.start()
+        # API 호출 (응답을 기다리는 이전 요청은 취소)
+        worker = PuterWorker(message, self.image_path)
+        worker.signals.result.connect(self.handle_response)
+        worker.signals.chunk.connect(self.handle_chunk)
+        worker.signals.error.connect(self.handle_error)
+        self.streaming_message = None
+        if not self.executor.submit(worker, key=self):
+            self.handle_error("요청 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+            return
         
         # 전송 버튼 비활성화
         self.send_btn.setEnabled(False)
         self.send_btn.setText('응답 대기 중...')
         
+    def handle_chunk(self, text):
+        # 첫 조각이 오면 AI 메시지를 만들고 이후 조각은 이어 붙임 (마지막 줄만 갱신됨)
+        if self.streaming_message is None:
+            self.streaming_message = {
+                "role": "assistant",
+                "content": ""
+            }
+            self.messages.append(self.streaming_message)
+        
+        self.streaming_message["content"] += text
+        self.update_chat_display()
+        
     def handle_response(self, response_text):
-        # AI 응답 추가
-        self.messages.append({
-            "role": "assistant",
-            "content": response_text
-        })
+        # AI 응답 추가 (스트리밍으로 표시 중이면 전체 텍스트로 확정)
+        if self.streaming_message is not None:
+            self.streaming_message["content"] = response_text
+            self.streaming_message = None
+        else:
+            self.messages.append({
+                "role": "assistant",
+                "content": response_text
+            })
         
         self.update_chat_display()
         
@@ -205,26 +208,31 @@ class ChatBot(QWidget):
         self.send_btn.setText('전송')
         
     def handle_error(self, error_msg):
+        # 스트리밍 도중 실패하면 받은 부분까지만 남김
+        self.streaming_message = None
         self.chat_display.append(f"❌ 오류: {error_msg}")
         self.send_btn.setEnabled(True)
         self.send_btn.setText('전송')
         
     def update_chat_display(self):
-        self.chat_display.clear()
-        for msg in self.messages:
-            if msg['role'] == 'user':
-                self.chat_display.append(f"👤 사용자: {msg['content']}")
-                if msg.get('image'):
-                    self.chat_display.append("   [이미지 첨부됨]")
-            else:
-                self.chat_display.append(f"🤖 AI: {msg['content']}")
-            self.chat_display.append("")
+        # 새 메시지만 추가하고 내용이 바뀐 마지막 메시지만 갱신
+        self.chat_display.sync(self.messages)
             
     def clear_chat(self):
+        # 진행 중인 요청 취소
+        self.executor.cancel(self)
+        self.send_btn.setEnabled(True)
+        self.send_btn.setText('전송')
+        
         self.messages = []
+        self.streaming_message = None
         self.chat_display.clear()
         self.clear_image()
 
+    def closeEvent(self, event):
+        self.executor.cancel(self)
+        super().closeEvent(event)
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     chatbot = ChatBot()
@@ -1,27 +1,26 @@
 import sys
 import requests
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QTextEdit, QLineEdit, QPushButton, QLabel, QFileDialog, QHBoxLayout
+    QApplication, QWidget, QVBoxLayout, QLineEdit, QPushButton, QLabel, QFileDialog, QHBoxLayout
 )
 from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PIL import Image
-import base64
-import io
+from PyQt5.QtCore import Qt
 import json
 import time
 
-# Puter AI API를 웹 브라우저를 통해 호출하는 방식
-class PuterWorker(QThread):
-    result = pyqtSignal(str)
-    error = pyqtSignal(str)
+from puter_http import get_puter_http
+from puter_image import image_data_url
+from puter_chat_view import ChatView
+from puter_chat_pool import PooledWorker, get_chat_executor
 
+# Puter AI API를 웹 브라우저를 통해 호출하는 방식
+class PuterWorker(PooledWorker):
     def __init__(self, message, image_path=None):
         super().__init__()
         self.message = message
         self.image_path = image_path
 
-    def run(self):
+    def execute(self):
         try:
             # Puter AI API를 직접 호출하는 방식
             # 실제로는 Puter의 JavaScript SDK가 내부적으로 사용하는 API를 호출
@@ -42,16 +41,14 @@ class PuterWorker(QThread):
                 "temperature": 0.7
             }
             
-            # 이미지가 있는 경우 base64로 인코딩하여 추가
+            # 이미지가 있는 경우 축소/재인코딩하여 추가
             if self.image_path:
-                with open(self.image_path, 'rb') as img_file:
-                    img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                    messages[0]["content"] = [
-                        {"type": "text", "text": self.message},
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{img_data}"}}
-                    ]
+                messages[0]["content"] = [
+                    {"type": "text", "text": self.message},
+                    {"type": "image_url", "image_url": {"url": image_data_url(self.image_path)}}
+                ]
             
-            response = requests.post(api_url, headers=headers, json=data, timeout=30)
+            response = get_puter_http().post(api_url, headers=headers, json=data, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -73,6 +70,8 @@ class ChatBot(QWidget):
         super().__init__()
         self.messages = []
         self.image_path = None
+        # 요청은 공용 스레드 풀에서 실행 (창마다 하나의 대화)
+        self.executor = get_chat_executor()
         self.init_ui()
         
     def init_ui(self):
@@ -82,8 +81,7 @@ class ChatBot(QWidget):
         layout = QVBoxLayout()
         
         # 채팅 히스토리 표시 영역
-        self.chat_display = QTextEdit()
-        self.chat_display.setReadOnly(True)
+        self.chat_display = ChatView()
         layout.addWidget(QLabel('대화 내용:'))
         layout.addWidget(self.chat_display)
         
@@ -159,11 +157,13 @@ class ChatBot(QWidget):
         # 입력 필드 초기화
         self.input_field.clear()
         
-        # API 호출
-        self.worker = PuterWorker(message, self.image_path)
-        self.worker.result.connect(self.handle_response)
-        self.worker.error.connect(self.handle_error)
-        self.worker.start()
+        # API 호출 (응답을 기다리는 이전 요청은 취소)
+        worker = PuterWorker(message, self.image_path)
+        worker.signals.result.connect(self.handle_response)
+        worker.signals.error.connect(self.handle_error)
+        if not self.executor.submit(worker, key=self):
+            self.handle_error("요청 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+            return
         
         # 전송 버튼 비활성화
         self.send_btn.setEnabled(False)
@@ -188,21 +188,23 @@ class ChatBot(QWidget):
         self.send_btn.setText('전송')
         
     def update_chat_display(self):
-        self.chat_display.clear()
-        for msg in self.messages:
-            if msg['role'] == 'user':
-                self.chat_display.append(f"👤 사용자: {msg['content']}")
-                if msg.get('image'):
-                    self.chat_display.append("   [이미지 첨부됨]")
-            else:
-                self.chat_display.append(f"🤖 AI: {msg['content']}")
-            self.chat_display.append("")
+        # 새 메시지만 추가하고 내용이 바뀐 마지막 메시지만 갱신
+        self.chat_display.sync(self.messages)
             
     def clear_chat(self):
+        # 진행 중인 요청 취소
+        self.executor.cancel(self)
+        self.send_btn.setEnabled(True)
+        self.send_btn.setText('전송')
+        
         self.messages = []
         self.chat_display.clear()
         self.clear_image()
 
+    def closeEvent(self, event):
+        self.executor.cancel(self)
+        super().closeEvent(event)
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     chatbot = ChatBot()
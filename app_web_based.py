@@ -1,122 +1,43 @@
 import sys
+import functools
 import requests
 import json
-import time
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QTextEdit, QLineEdit, QPushButton, QLabel, QFileDialog, QHBoxLayout
+    QApplication, QWidget, QVBoxLayout, QLineEdit, QPushButton, QLabel, QFileDialog, QHBoxLayout
 )
 from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
-from PyQt5.QtWebEngineCore import QWebEngineProfile
-from PyQt5.QtCore import QUrl
-from PIL import Image
-import base64
-import io
-import os
+from PyQt5.QtCore import Qt
+from puter_qt_bridge import PuterWebRunner
+from puter_chat_view import ChatView
+from puter_chat_pool import PooledWorker, get_chat_executor
+from puter_image import ImageError, image_data_url
+
+class PuterWorker(PuterWebRunner):
+    """채팅 실행기 (GUI 스레드에서 한 번 만들어 재사용)"""
 
-class PuterWebPage(QWebEnginePage):
     def __init__(self, parent=None):
-        super().__init__(parent)
-        self.chat_result = None
+        super().__init__(parent, page_file="temp_chat.html")
+
+    def send(self, message, image_url=None):
+        # 이미지는 ImageWorker가 미리 data URL로 변환해 둠
+        image_html = ""
+        if image_url:
+            image_html = f'<img src="{image_url}">'
         
-    def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
-        print(f"JS Console: {message}")
-        if "AI 응답:" in message:
-            self.chat_result = message.replace("AI 응답:", "").strip()
+        return self.run(message, model='claude-sonnet-4', body_html=image_html, timeout_ms=30000)
 
-class PuterWorker(QThread):
-    result = pyqtSignal(str)
-    error = pyqtSignal(str)
+class ImageWorker(PooledWorker):
+    """첨부 이미지 변환 작업 (디코딩/축소/재인코딩을 GUI 스레드 밖에서 실행)"""
 
-    def __init__(self, message, image_path=None):
+    def __init__(self, image_path):
         super().__init__()
-        self.message = message
         self.image_path = image_path
-        self.web_view = None
 
-    def run(self):
+    def execute(self):
         try:
-            # 임시 HTML 파일 생성
-            html_content = self.create_html_content()
-            temp_file = "temp_chat.html"
-            
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # 웹뷰 생성 및 실행
-            self.web_view = QWebEngineView()
-            self.web_page = PuterWebPage()
-            self.web_view.setPage(self.web_page)
-            
-            # 로컬 서버 URL로 접근
-            self.web_view.load(QUrl("http://localhost:8000/temp_chat.html"))
-            
-            # 응답 대기
-            timeout = 30
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                if self.web_page.chat_result:
-                    self.result.emit(self.web_page.chat_result)
-                    break
-                time.sleep(0.5)
-            else:
-                self.error.emit("응답 시간 초과")
-                
-            # 임시 파일 삭제
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-                
-        except Exception as e:
-            self.error.emit(f"오류: {str(e)}")
-
-    def create_html_content(self):
-        # 이미지 처리
-        image_script = ""
-        if self.image_path:
-            with open(self.image_path, 'rb') as img_file:
-                img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                image_script = f"""
-                const img = document.createElement('img');
-                img.src = 'data:image/jpeg;base64,{img_data}';
-                document.body.appendChild(img);
-                """
-        
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Puter AI Chat</title>
-        </head>
-        <body>
-            <div id="result"></div>
-            {image_script}
-            <script src="https://js.puter.com/v2/"></script>
-            <script>
-                (async () => {{
-                    try {{
-                        const response = await puter.ai.chat(
-                            "{self.message.replace('"', '\\"')}", 
-                            {{
-                                model: 'claude-sonnet-4'
-                            }}
-                        );
-                        
-                        const result = response.message.content[0].text;
-                        console.log('AI 응답: ' + result);
-                        document.getElementById('result').innerHTML = result;
-                        
-                    }} catch (error) {{
-                        console.error('오류:', error);
-                        document.getElementById('result').innerHTML = '오류: ' + error.message;
-                    }}
-                }})();
-            </script>
-        </body>
-        </html>
-        """
+            self.result.emit(image_data_url(self.image_path))
+        except ImageError as e:
+            self.error.emit(str(e))
 
 class ChatBot(QWidget):
     def __init__(self):
@@ -125,6 +46,13 @@ class ChatBot(QWidget):
         self.image_path = None
         self.init_ui()
         
+        # 웹뷰는 GUI 스레드에서 한 번만 만들고 결과는 시그널로 받음
+        self.worker = PuterWorker(self)
+        self.worker.result.connect(self.handle_response)
+        self.worker.error.connect(self.handle_error)
+        # 이미지 변환은 공용 스레드 풀에서 실행
+        self.executor = get_chat_executor()
+        
     def init_ui(self):
         self.setWindowTitle('Puter AI 챗봇 (웹 기반)')
         self.setGeometry(100, 100, 800, 600)
@@ -132,8 +60,7 @@ class ChatBot(QWidget):
         layout = QVBoxLayout()
         
         # 채팅 히스토리 표시 영역
-        self.chat_display = QTextEdit()
-        self.chat_display.setReadOnly(True)
+        self.chat_display = ChatView()
         layout.addWidget(QLabel('대화 내용:'))
         layout.addWidget(self.chat_display)
         
@@ -209,16 +136,21 @@ class ChatBot(QWidget):
         # 입력 필드 초기화
         self.input_field.clear()
         
-        # API 호출
-        self.worker = PuterWorker(message, self.image_path)
-        self.worker.result.connect(self.handle_response)
-        self.worker.error.connect(self.handle_error)
-        self.worker.start()
-        
         # 전송 버튼 비활성화
         self.send_btn.setEnabled(False)
         self.send_btn.setText('응답 대기 중...')
         
+        if not self.image_path:
+            self.worker.send(message)
+            return
+        
+        # 이미지 변환이 끝나면 GUI 스레드에서 전송 (읽을 수 없는 이미지는 오류만 표시)
+        image_worker = ImageWorker(self.image_path)
+        image_worker.signals.result.connect(functools.partial(self.worker.send, message))
+        image_worker.signals.error.connect(self.handle_error)
+        if not self.executor.submit(image_worker, key=self):
+            self.handle_error("요청 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+        
     def handle_response(self, response_text):
         # AI 응답 추가
         self.messages.append({
@@ -238,21 +170,26 @@ class ChatBot(QWidget):
         self.send_btn.setText('전송')
         
     def update_chat_display(self):
-        self.chat_display.clear()
-        for msg in self.messages:
-            if msg['role'] == 'user':
-                self.chat_display.append(f"👤 사용자: {msg['content']}")
-                if msg.get('image'):
-                    self.chat_display.append("   [이미지 첨부됨]")
-            else:
-                self.chat_display.append(f"🤖 AI: {msg['content']}")
-            self.chat_display.append("")
+        # 새 메시지만 추가하고 내용이 바뀐 마지막 메시지만 갱신
+        self.chat_display.sync(self.messages)
             
     def clear_chat(self):
+        # 진행 중인 요청 취소 (이미지 변환 중이면 변환 결과도 전송하지 않음)
+        self.executor.cancel(self)
+        if self.worker.is_running():
+            self.worker.cancel()
+        self.send_btn.setEnabled(True)
+        self.send_btn.setText('전송')
+        
         self.messages = []
         self.chat_display.clear()
         self.clear_image()
 
+    def closeEvent(self, event):
+        self.executor.cancel(self)
+        self.worker.cancel()
+        super().closeEvent(event)
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     chatbot = ChatBot()
@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import httpx
+
+from stub_upstream import create_stub_server
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 측정할 수 있는 엔드포인트 (이름 → (메서드, 경로))
+ENDPOINTS = {
+    "chat": ("POST", "/chat"),
+    "health": ("GET", "/health"),
+    "models": ("GET", "/models"),
+}
+
+
+def free_port() -> int:
+    """사용 가능한 로컬 포트 찾기"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """정렬된 값 목록의 백분위수 (최근접 순위)"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def process_rss(pid: int) -> Dict[int, int]:
+    """프로세스와 자식 프로세스의 RSS (바이트)"""
+    if psutil:
+        try:
+            root = psutil.Process(pid)
+            procs = [root] + root.children(recursive=True)
+            return {p.pid: p.memory_info().rss for p in procs if p.is_running()}
+        except psutil.Error:
+            return {}
+
+    # psutil이 없으면 /proc에서 직접 읽음 (Linux)
+    result = {}
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        result[p] = int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return result
+
+
+def git_commit() -> Optional[str]:
+    """현재 git 커밋 해시 (결과 비교용)"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class ServerUnderTest:
+    """벤치마크 대상 앱을 serve.py로 별도 프로세스에서 실행"""
+
+    def __init__(self, app: str, port: int, workers: int, threads: int, upstream_url: str,
+                 extra_env: Dict[str, str] = None):
+        self.app = app
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.env = dict(os.environ, PUTER_UPSTREAM_URL=upstream_url, **(extra_env or {}))
+        self.process = None
+
+    def start(self, timeout: float = 30):
+        serve = os.path.join(os.path.dirname(os.path.abspath(__file__)), "serve.py")
+        self.process = subprocess.Popen(
+            [sys.executable, serve, "--app", self.app, "--host", "127.0.0.1",
+             "--port", str(self.port), "--workers", str(self.workers),
+             "--threads", str(self.threads)],
+            env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        # /health가 응답할 때까지 대기
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("서버 프로세스가 시작 중에 종료되었습니다.")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        raise RuntimeError("서버 시작 시간 초과")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+
+async def run_load(base_url: str, endpoint: str, concurrency: int, duration: float,
+                   rate: Optional[float], cache: str, warmup: float) -> Dict[str, Any]:
+    """
+    부하 생성 및 측정
+
+    Args:
+        base_url: 대상 서버 URL
+        endpoint: 측정할 엔드포인트 이름 (chat | health | models)
+        concurrency: 동시 연결 수
+        duration: 측정 시간 (초)
+        rate: 초당 요청 수 (None이면 동시 연결 수만큼 쉬지 않고 요청)
+        cache: /chat 요청의 캐시 모드
+        warmup: 측정 전 워밍업 시간 (초)
+    """
+    method, path = ENDPOINTS[endpoint]
+    latencies = []
+    errors = {}
+    sent = 0
+    measuring = False
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def one_request(seq: int):
+            nonlocal sent
+            body = None
+            if method == "POST":
+                body = {"message": f"벤치마크 메시지 {seq}", "cache": cache}
+
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+                error = None if status == 200 else f"http_{status}"
+            except httpx.HTTPError as e:
+                error = type(e).__name__
+            elapsed = time.perf_counter() - start
+
+            if measuring:
+                sent += 1
+                if error:
+                    errors[error] = errors.get(error, 0) + 1
+                else:
+                    latencies.append(elapsed)
+
+        async def closed_loop_worker(worker_id: int, stop_at: float):
+            seq = worker_id
+            while time.perf_counter() < stop_at:
+                await one_request(seq)
+                seq += concurrency
+
+        async def open_loop(stop_at: float):
+            # 고정 속도로 요청을 발생시키되 동시 실행 수는 concurrency로 제한
+            semaphore = asyncio.Semaphore(concurrency)
+            interval = 1.0 / rate
+            tasks = set()
+            seq = 0
+            next_at = time.perf_counter()
+
+            async def limited(n):
+                async with semaphore:
+                    await one_request(n)
+
+            while time.perf_counter() < stop_at:
+                task = asyncio.create_task(limited(seq))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                seq += 1
+                next_at += interval
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+            if tasks:
+                await asyncio.gather(*tasks)
+
+        async def phase(seconds: float):
+            stop_at = time.perf_counter() + seconds
+            if rate:
+                await open_loop(stop_at)
+            else:
+                await asyncio.gather(*[closed_loop_worker(i, stop_at) for i in range(concurrency)])
+
+        if warmup:
+            await phase(warmup)
+
+        measuring = True
+        started = time.perf_counter()
+        await phase(duration)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": sent,
+        "rps": round(len(latencies) / elapsed, 2),
+        "error_rate": round(sum(errors.values()) / sent, 4) if sent else 0.0,
+        "errors": errors,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+    }
+
+
+def compare(current: Dict[str, Any], baseline_path: str):
+    """이전 결과 파일과 비교해 변화율 출력"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\n📊 비교 기준: {baseline_path} (커밋 {baseline.get('commit')})")
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+
+        def change(new, old):
+            return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+        print(f"  {name}: RPS {before['rps']} → {result['rps']} ({change(result['rps'], before['rps'])}), "
+              f"p99 {before['latency_ms']['p99']} → {result['latency_ms']['p99']}ms "
+              f"({change(result['latency_ms']['p99'], before['latency_ms']['p99'])})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask 앱 처리량/지연 시간 벤치마크")
+    parser.add_argument("--app", default="puter_flask_server",
+                        choices=("puter_flask_server", "app", "cloudtype_app"))
+    parser.add_argument("--endpoints", default="chat,health,models",
+                        help="측정할 엔드포인트 (쉼표로 구분)")
+    parser.add_argument("--concurrency", type=int, default=32, help="동시 연결 수")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="초당 요청 수 (지정하지 않으면 최대 부하)")
+    parser.add_argument("--duration", type=float, default=10, help="엔드포인트별 측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=2, help="측정 전 워밍업 시간 (초)")
+    parser.add_argument("--upstream-latency", type=float, default=0.2,
+                        help="스텁 업스트림 응답 지연 (초)")
+    parser.add_argument("--workers", type=int, default=2, help="서버 워커 프로세스 수")
+    parser.add_argument("--threads", type=int, default=16, help="워커당 스레드 수")
+    parser.add_argument("--cache", default="bypass", choices=("use", "bypass", "refresh"),
+                        help="/chat 요청의 캐시 모드")
+    parser.add_argument("--output", default=None, help="결과 JSON 파일 경로")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    for name in endpoints:
+        if name not in ENDPOINTS:
+            parser.error(f"알 수 없는 엔드포인트: {name}")
+
+    # 스텁 업스트림 시작
+    stub = create_stub_server(port=0, latency=args.upstream_latency)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    upstream_url = f"http://127.0.0.1:{stub.server_port}"
+
+    server = ServerUnderTest(args.app, free_port(), args.workers, args.threads, upstream_url)
+    print(f"🚀 {args.app} 시작 (워커 {args.workers} × 스레드 {args.threads}, 업스트림 지연 {args.upstream_latency}초)")
+    server.start()
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "config": vars(args),
+        "results": {},
+    }
+
+    try:
+        for name in endpoints:
+            print(f"⏱️ {name}: 동시 {args.concurrency}, {args.duration}초 측정 중...")
+            result = asyncio.run(run_load(
+                server.url, name, args.concurrency, args.duration,
+                args.rate, args.cache, args.warmup
+            ))
+            rss = process_rss(server.process.pid)
+            result["rss_bytes"] = {str(pid): value for pid, value in rss.items()}
+            result["rss_total_mb"] = round(sum(rss.values()) / 1024 / 1024, 1)
+            report["results"][name] = result
+
+            latency = result["latency_ms"]
+            print(f"   RPS {result['rps']} | p50 {latency['p50']}ms p95 {latency['p95']}ms "
+                  f"p99 {latency['p99']}ms | 오류율 {result['error_rate'] * 100:.2f}% | "
+                  f"RSS {result['rss_total_mb']}MB")
+    finally:
+        server.stop()
+        stub.shutdown()
+
+    output = args.output or f"bench_results/{args.app}_{report['commit'] or 'unknown'}_{int(time.time())}.json"
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
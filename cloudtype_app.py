@@ -1,10 +1,5 @@
-from flask import Flask, request, jsonify, render_template_string
-import requests
-import json
 import os
-from datetime import datetime
-
-app = Flask(__name__)
+from puter_app import create_app
 
 # HTML 템플릿
 HTML_TEMPLATE = """
@@ -189,6 +184,21 @@ HTML_TEMPLATE = """
                     </div>
                 </div>
                 
+                <div class="endpoint">
+                    <h4><span class="method">POST</span> /chat/batch - AI 채팅 일괄 처리</h4>
+                    <p>여러 요청을 서버에서 병렬로 처리하고 순서대로 반환합니다. <code>"stream": true</code>이면 완료 순으로 NDJSON을 전송합니다.</p>
+                    <div class="code-block">
+{
+  "requests": [
+    {"message": "안녕하세요!"},
+    {"message": "파이썬에 대해 설명해주세요"}
+  ],
+  "model": "claude-sonnet-4",
+  "max_concurrency": 16
+}
+                    </div>
+                </div>
+                
                 <div class="endpoint">
                     <h4><span class="method">GET</span> /health - 서버 상태</h4>
                     <p>서버가 정상적으로 작동하는지 확인합니다.</p>
@@ -268,141 +278,15 @@ print(result["response"])
 </html>
 """
 
-class PuterAIServer:
-    """Puter AI 서버 클래스"""
-    
-    def __init__(self):
-        self.base_url = "https://api.puter.com"  # 실제 API 엔드포인트
-    
-    def chat(self, message: str, model: str = "claude-sonnet-4", 
-             system_prompt: str = None) -> dict:
-        """
-        AI 채팅 요청
-        
-        Args:
-            message: 사용자 메시지
-            model: AI 모델
-            system_prompt: 시스템 프롬프트
-            
-        Returns:
-            응답 결과
-        """
-        try:
-            # 시스템 프롬프트에 따른 응답 생성
-            if system_prompt and "댓글" in system_prompt:
-                # 댓글 생성 모드
-                responses = [
-                    "좋은 글이네요! 👍",
-                    "정말 유익한 정보 감사합니다 😊",
-                    "와! 대단하네요 👏",
-                    "흥미로운 내용이에요!",
-                    "도움이 많이 되었어요 💕",
-                    "정말 잘 정리해주셨네요!",
-                    "감사합니다! 좋은 정보였어요",
-                    "와우! 놀라워요 😮",
-                    "정말 멋진 글이에요 ✨",
-                    "추천합니다! 👍"
-                ]
-                
-                import random
-                response = random.choice(responses)
-                
-                # 본문 내용에 따른 맞춤 응답
-                if "날씨" in message:
-                    response = "날씨가 정말 좋네요! 😊"
-                elif "음식" in message or "맛" in message:
-                    response = "맛있겠어요! 🤤"
-                elif "여행" in message:
-                    response = "여행 재미있겠어요! ✈️"
-                elif "공부" in message or "학습" in message:
-                    response = "열심히 공부하세요! 📚"
-                elif "운동" in message or "운동" in message:
-                    response = "건강한 하루 되세요! 💪"
-                elif "고민" in message or "힘들" in message:
-                    response = "힘내세요! 응원할게요 💪"
-                elif "축하" in message or "생일" in message:
-                    response = "축하드려요! 🎉"
-                elif "감사" in message:
-                    response = "천만에요! 😊"
-                elif "?" in message or "?" in message:
-                    response = "좋은 질문이네요! 🤔"
-                else:
-                    response = random.choice(responses)
-                    
-            else:
-                # 일반 채팅 모드
-                response = f"안녕하세요! '{message}'에 대한 답변입니다. 현재는 시뮬레이션 모드로 작동하고 있습니다."
-            
-            return {
-                "success": True,
-                "response": response,
-                "model": model,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
-
-# 서버 인스턴스 생성
-puter_server = PuterAIServer()
-
-@app.route('/')
-def index():
-    """메인 페이지"""
-    return render_template_string(HTML_TEMPLATE)
-
-@app.route('/chat', methods=['POST'])
-def chat():
-    """AI 채팅 API 엔드포인트"""
-    try:
-        data = request.get_json()
-        
-        if not data or 'message' not in data:
-            return jsonify({
-                "success": False,
-                "error": "메시지가 필요합니다."
-            }), 400
-        
-        message = data['message']
-        model = data.get('model', 'claude-sonnet-4')
-        system_prompt = data.get('system_prompt')
-        
-        # AI 응답 요청
-        result = puter_server.chat(message, model, system_prompt)
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
-
-@app.route('/health')
-def health():
-    """서버 상태 확인"""
-    return jsonify({
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "service": "Puter AI API Server - CloudType",
-        "version": "1.0.0"
-    })
+app = create_app({
+    "backend": "comment",
+    "service": "Puter AI API Server - CloudType",
+    "version": "1.0.0",
+    "html_template": HTML_TEMPLATE
+})
 
-@app.route('/models')
-def models():
-    """사용 가능한 모델 목록"""
-    return jsonify({
-        "models": [
-            "claude-sonnet-4",
-            "claude-3-5-sonnet", 
-            "claude-3-opus",
-            "gpt-4",
-            "gpt-3.5-turbo"
-        ]
-    })
+# 서버 인스턴스 (app.extensions["puter"]와 동일)
+puter_server = app.extensions["puter"]
 
 if __name__ == '__main__':
     # CloudType에서는 PORT 환경변수를 사용
@@ -2,110 +2,167 @@ import sys
 import requests
 import json
 import time
+import argparse
+import csv
+from collections import deque
+from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QTextEdit, QLineEdit, QPushButton, QLabel, QHBoxLayout
 )
 from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
-from PyQt5.QtCore import QUrl
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSignal
+from puter_qt_bridge import PuterWarmRunner
 import base64
 import io
 import os
 
-class CommentWorker(QThread):
-    result = pyqtSignal(str)
-    error = pyqtSignal(str)
+# 입력 파일에서 본문으로 사용할 필드 (앞에 있는 것 우선)
+POST_FIELDS = ("content", "본문", "post", "text")
 
-    def __init__(self, post_content):
-        super().__init__()
-        self.post_content = post_content
+def build_comment_prompt(post_content):
+    return f'넌 이제부터 댓글싸게야 내가 본문 복사 붙이기 하면 넌 바로 복사 붙이기 할 수 있게 댓글 적어줘 알겠지? 본문내용: "{post_content}"'
+
+class CommentWorker(PuterWarmRunner):
+    """댓글 생성 실행기 (GUI 스레드에서 한 번 만들고, SDK를 불러 둔 페이지를 계속 사용)"""
+
+    def generate(self, post_content):
+        return self.run(build_comment_prompt(post_content), model='claude-sonnet-4', timeout_ms=30000)
 
-    def run(self):
-        try:
-            # 임시 HTML 파일 생성
-            html_content = self.create_html_content()
-            temp_file = "temp_comment.html"
-            
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # 웹뷰 생성 및 실행
-            self.web_view = QWebEngineView()
-            self.web_page = CommentWebPage()
-            self.web_view.setPage(self.web_page)
-            
-            # 로컬 서버 URL로 접근
-            self.web_view.load(QUrl("http://localhost:8000/temp_comment.html"))
-            
-            # 응답 대기
-            timeout = 30
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                if self.web_page.comment_result:
-                    self.result.emit(self.web_page.comment_result)
-                    break
-                time.sleep(0.5)
-            else:
-                self.error.emit("응답 시간 초과")
-                
-            # 임시 파일 삭제
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-                
-        except Exception as e:
-            self.error.emit(f"오류: {str(e)}")
+    def submit_comment(self, post_content, timeout_ms=60000):
+        """다른 요청과 동시에 댓글 생성 (결과는 finished/failed 시그널)"""
+        return self.submit(build_comment_prompt(post_content), model='claude-sonnet-4', timeout_ms=timeout_ms)
 
-    def create_html_content(self):
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>댓글 생성기</title>
-        </head>
-        <body>
-            <div id="result"></div>
-            <script src="https://js.puter.com/v2/"></script>
-            <script>
-                (async () => {{
-                    try {{
-                        const prompt = `넌 이제부터 댓글싸게야 내가 본문 복사 붙이기 하면 넌 바로 복사 붙이기 할 수 있게 댓글 적어줘 알겠지? 본문내용: "{self.post_content.replace('"', '\\"')}"`;
-                        
-                        const response = await puter.ai.chat(prompt, {{
-                            model: 'claude-sonnet-4'
-                        }});
-                        
-                        const result = response.message.content[0].text;
-                        console.log('댓글 결과: ' + result);
-                        document.getElementById('result').innerHTML = result;
-                        
-                    }} catch (error) {{
-                        console.error('오류:', error);
-                        document.getElementById('result').innerHTML = '오류: ' + error.message;
-                    }}
-                }})();
-            </script>
-        </body>
-        </html>
-        """
+def load_posts(path):
+    """
+    CSV/JSONL 파일에서 본문 목록 읽기
+    
+    CSV는 content/본문/post/text 열(없으면 첫 번째 열)을, JSONL은 같은 이름의 필드나 문자열 줄을 본문으로 사용합니다.
+    id 열/필드가 없으면 줄 번호를 ID로 사용합니다.
+    
+    Returns:
+        [{"id": ..., "content": ...}, ...]
+    """
+    posts = []
+    
+    if path.lower().endswith('.csv'):
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames or []
+            field = next((name for name in POST_FIELDS if name in fieldnames), fieldnames[0] if fieldnames else None)
+            for index, row in enumerate(reader, 1):
+                posts.append({"id": str(row.get('id') or index), "content": (row.get(field) or '').strip()})
+    else:
+        with open(path, encoding='utf-8') as f:
+            for index, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                item = json.loads(line)
+                if isinstance(item, dict):
+                    content = next((item[name] for name in POST_FIELDS if name in item), '')
+                    post_id = item.get('id', index)
+                else:
+                    content, post_id = item, index
+                posts.append({"id": str(post_id), "content": str(content).strip()})
+    
+    return [post for post in posts if post['content']]
+
+def completed_ids(output_path):
+    """이미 댓글 생성에 성공한 본문 ID (이어서 실행할 때 건너뜀, 실패한 본문은 다시 시도)"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 중단되며 잘린 줄
+                continue
+            if record.get('success'):
+                done.add(str(record.get('id')))
+    return done
 
-class CommentWebPage(QWebEnginePage):
-    def __init__(self, parent=None):
+class BulkCommentRunner(QObject):
+    """여러 본문의 댓글을 하나의 페이지에서 동시에 생성하고 끝나는 순서대로 JSONL에 기록"""
+    
+    done = pyqtSignal()
+
+    def __init__(self, posts, output_path, concurrency=4, timeout_ms=60000, parent=None):
         super().__init__(parent)
-        self.comment_result = None
+        self.pending = deque(posts)
+        self.total = len(posts)
+        self.concurrency = max(1, concurrency)
+        self.timeout_ms = timeout_ms
+        self.in_flight = {}
+        self.succeeded = 0
+        self.failed = 0
+        
+        # 중단되며 잘린 마지막 줄 뒤에 이어 쓰지 않도록 줄바꿈 보정
+        needs_newline = False
+        if os.path.exists(output_path) and os.path.getsize(output_path):
+            with open(output_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        self.output = open(output_path, 'a', encoding='utf-8')
+        if needs_newline:
+            self.output.write('\n')
+        
+        self.worker = CommentWorker(self)
+        self.worker.finished.connect(self.handle_result)
+        self.worker.failed.connect(self.handle_error)
+
+    def start(self):
+        self.started_at = time.time()
+        self.fill()
+
+    def fill(self):
+        """동시 처리 수만큼 요청 채우기 (모두 끝나면 done 시그널)"""
+        while self.pending and len(self.in_flight) < self.concurrency:
+            post = self.pending.popleft()
+            self.in_flight[self.worker.submit_comment(post['content'], self.timeout_ms)] = post
         
-    def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
-        print(f"JS Console: {message}")
-        if "댓글 결과:" in message:
-            self.comment_result = message.replace("댓글 결과:", "").strip()
+        if not self.in_flight:
+            self.output.close()
+            elapsed = time.time() - self.started_at
+            print(f"\n✅ 완료: 성공 {self.succeeded}개, 실패 {self.failed}개 ({elapsed:.1f}초)")
+            self.done.emit()
+
+    def write(self, post, **fields):
+        record = {"id": post['id'], "content": post['content'], **fields, "timestamp": datetime.now().isoformat()}
+        # 끝날 때마다 바로 기록해 중단되어도 이어서 실행할 수 있도록 함
+        self.output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.output.flush()
+
+    def handle_result(self, request_id, comment):
+        post = self.in_flight.pop(request_id, None)
+        if post is None:
+            return
+        self.succeeded += 1
+        self.write(post, success=True, comment=comment)
+        print(f"[{self.succeeded + self.failed}/{self.total}] ✅ {post['id']}")
+        self.fill()
+
+    def handle_error(self, request_id, error_msg):
+        post = self.in_flight.pop(request_id, None)
+        if post is None:
+            return
+        self.failed += 1
+        self.write(post, success=False, error=error_msg)
+        print(f"[{self.succeeded + self.failed}/{self.total}] ❌ {post['id']}: {error_msg}")
+        self.fill()
 
 class CommentGenerator(QWidget):
     def __init__(self):
         super().__init__()
         self.init_ui()
         
+        # 웹뷰는 GUI 스레드에서 한 번만 만들고 결과는 시그널로 받음
+        self.worker = CommentWorker(self)
+        self.worker.result.connect(self.handle_result)
+        self.worker.error.connect(self.handle_error)
+        
     def init_ui(self):
         self.setWindowTitle('댓글 생성기')
         self.setGeometry(100, 100, 800, 600)
@@ -218,11 +275,8 @@ class CommentGenerator(QWidget):
         self.generate_btn.setEnabled(False)
         self.generate_btn.setText('🔄 댓글 생성 중...')
         
-        # 워커 시작
-        self.worker = CommentWorker(post_content)
-        self.worker.result.connect(self.handle_result)
-        self.worker.error.connect(self.handle_error)
-        self.worker.start()
+        # 댓글 생성 시작
+        self.worker.generate(post_content)
         
     def handle_result(self, comment):
         self.result_display.setText(comment)
@@ -246,10 +300,55 @@ class CommentGenerator(QWidget):
             self.result_display.append("\n\n✅ 클립보드에 복사되었습니다!")
         
     def clear_all(self):
+        # 생성 중인 댓글 취소
+        if self.worker.is_running():
+            self.worker.cancel()
+            self.generate_btn.setEnabled(True)
+            self.generate_btn.setText('🤖 댓글 생성')
+        
         self.post_input.clear()
         self.result_display.clear()
+        
+    def closeEvent(self, event):
+        self.worker.cancel()
+        super().closeEvent(event)
+
+def run_bulk(args):
+    """창 없이 입력 파일의 본문들에 댓글 일괄 생성"""
+    output_path = args.output or os.path.splitext(args.bulk)[0] + '_comments.jsonl'
+    if args.restart and os.path.exists(output_path):
+        os.remove(output_path)
+    
+    posts = load_posts(args.bulk)
+    done = completed_ids(output_path)
+    todo = [post for post in posts if post['id'] not in done]
+    print(f"📄 본문 {len(posts)}개 중 {len(posts) - len(todo)}개는 이미 완료, {len(todo)}개 생성 (동시 {args.concurrency}개)")
+    print(f"💾 결과 파일: {output_path}")
+    if not todo:
+        return 0
+    
+    # 화면 없이 웹 엔진 실행
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QApplication(sys.argv)
+    
+    runner = BulkCommentRunner(todo, output_path, args.concurrency, int(args.timeout * 1000))
+    runner.done.connect(app.quit)
+    QTimer.singleShot(0, runner.start)
+    app.exec_()
+    return 0 if runner.failed == 0 else 1
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='댓글 생성기')
+    parser.add_argument('--bulk', metavar='INPUT', help='CSV/JSONL 파일의 본문들에 댓글 일괄 생성 (창 없이 실행)')
+    parser.add_argument('--output', help='결과 JSONL 파일 (기본값: <입력 파일>_comments.jsonl)')
+    parser.add_argument('--concurrency', type=int, default=4, help='동시에 생성할 댓글 수')
+    parser.add_argument('--timeout', type=float, default=60, help='본문 하나의 제한 시간 (초)')
+    parser.add_argument('--restart', action='store_true', help='이전 결과를 지우고 처음부터 실행')
+    args = parser.parse_args()
+    
+    if args.bulk:
+        sys.exit(run_bulk(args))
+    
     app = QApplication(sys.argv)
     
     # 스타일 설정
@@ -0,0 +1,162 @@
+import bisect
+import itertools
+import json
+import os
+import random
+from collections import deque
+from typing import Dict, List, Optional, Union
+
+# 기본 규칙 파일 (PUTER_COMMENT_RULES 환경변수로 변경 가능)
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "comment_rules.json")
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick 방식의 다중 키워드 매처
+
+    모든 키워드를 하나의 오토마톤으로 컴파일해 두므로,
+    규칙 수와 관계없이 메시지를 한 번만 훑어서 일치하는 규칙을 찾습니다.
+    """
+
+    def __init__(self, keywords: Dict[str, int]):
+        """
+        Args:
+            keywords: 키워드 → 규칙 번호 (번호가 작을수록 우선순위가 높음)
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        # 노드에 도달했을 때 일치하는 규칙 중 가장 우선순위가 높은 번호 (없으면 None)
+        self.best = [None]
+
+        for keyword, rule in keywords.items():
+            node = 0
+            for char in keyword:
+                if char not in self.goto[node]:
+                    self.goto[node][char] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(None)
+                node = self.goto[node][char]
+            self.best[node] = self._min(self.best[node], rule)
+
+        self._build_fail_links()
+
+    @staticmethod
+    def _min(a: Optional[int], b: Optional[int]) -> Optional[int]:
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a, b)
+
+    def _build_fail_links(self):
+        """너비 우선으로 실패 링크를 만들고 접미사 키워드의 규칙을 합침"""
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+
+                self.best[child] = self._min(self.best[child], self.best[self.fail[child]])
+
+    def match(self, text: str) -> Optional[int]:
+        """
+        텍스트에서 일치하는 규칙 중 우선순위가 가장 높은 규칙 번호 반환
+
+        Returns:
+            규칙 번호 (일치하는 키워드가 없으면 None)
+        """
+        goto = self.goto
+        fail = self.fail
+        best = self.best
+
+        node = 0
+        result = None
+
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            rule = best[node]
+            if rule is not None and (result is None or rule < result):
+                result = rule
+                if result == 0:
+                    break
+
+        return result
+
+
+class ReplyPool:
+    """가중치가 있는 답변 목록 (누적 가중치로 O(log n) 선택)"""
+
+    def __init__(self, replies: List[Union[str, dict]]):
+        self.texts = []
+        weights = []
+
+        for reply in replies:
+            if isinstance(reply, str):
+                reply = {"text": reply}
+            self.texts.append(reply["text"])
+            weights.append(float(reply.get("weight", 1)))
+
+        if not self.texts:
+            raise ValueError("답변 목록이 비어 있습니다.")
+
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def choose(self, rng: random.Random = random) -> str:
+        """가중치에 따라 답변 하나 선택"""
+        if len(self.texts) == 1:
+            return self.texts[0]
+        point = rng.random() * self.cumulative[-1]
+        return self.texts[bisect.bisect_right(self.cumulative, point)]
+
+
+class CommentRuleEngine:
+    """키워드 → 답변 목록 규칙을 한 번 컴파일해 두는 댓글 규칙 엔진"""
+
+    def __init__(self, rules: List[dict], default: List[Union[str, dict]]):
+        """
+        Args:
+            rules: {"keywords": [...], "replies": [...]} 목록 (앞에 있을수록 우선)
+            default: 일치하는 규칙이 없을 때 사용할 답변 목록
+        """
+        self.names = []
+        self.pools = []
+        keywords = {}
+
+        for index, rule in enumerate(rules):
+            self.names.append(rule.get("name", str(index)))
+            self.pools.append(ReplyPool(rule["replies"]))
+            for keyword in rule["keywords"]:
+                # 같은 키워드가 여러 규칙에 있으면 앞선 규칙이 우선
+                keywords.setdefault(keyword, index)
+
+        self.matcher = KeywordMatcher(keywords)
+        self.default = ReplyPool(default)
+
+    @classmethod
+    def from_file(cls, path: str = None) -> "CommentRuleEngine":
+        """JSON 규칙 파일로 엔진 생성"""
+        path = path or os.environ.get("PUTER_COMMENT_RULES", DEFAULT_RULES_PATH)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["rules"], data["default"])
+
+    def match(self, message: str) -> Optional[str]:
+        """메시지에 일치하는 규칙 이름 반환 (없으면 None)"""
+        rule = self.matcher.match(message)
+        return None if rule is None else self.names[rule]
+
+    def reply(self, message: str, rng: random.Random = random) -> str:
+        """메시지에 맞는 댓글 선택"""
+        rule = self.matcher.match(message)
+        pool = self.default if rule is None else self.pools[rule]
+        return pool.choose(rng)
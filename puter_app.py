@@ -0,0 +1,823 @@
+import json
+import os
+import re
+import time
+from contextlib import closing
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+
+from flask import Flask, request, jsonify, render_template_string, Response, stream_with_context, g
+
+from puter_upstream import get_upstream_engine, UpstreamBusy, UpstreamError
+from puter_cache import get_response_cache, make_cache_key, CACHE_MODES
+from puter_batch import parse_batch_request, iter_batch
+from puter_static import StaticPage, load_static_pages
+from comment_rules import CommentRuleEngine
+from puter_metrics import METRICS, SIZE_BUCKETS
+from puter_singleflight import SingleFlight
+from puter_conversations import get_conversation_store
+from puter_context import get_context_manager
+
+# 기본 앱 설정 (create_app에 전달한 값으로 덮어씀)
+DEFAULT_CONFIG = {
+    # 응답 백엔드 (simulation | comment | upstream | browser)
+    # PUTER_BACKEND 환경변수가 있으면 그 값을, PUTER_UPSTREAM_URL이 있으면 upstream을 사용
+    "backend": "simulation",
+    "service": "Puter AI Flask Server",
+    "version": None,
+    "html_template": "<h1>Puter AI 서버</h1>",
+    "static_pages": ["chatbot.html", "chatbot_with_post.html", "simple_chat.html"],
+    "models": [
+        "claude-sonnet-4",
+        "claude-3-5-sonnet",
+        "claude-3-opus",
+        "gpt-4",
+        "gpt-3.5-turbo"
+    ]
+}
+
+
+def split_tokens(text: str) -> List[str]:
+    """완성된 응답을 단어 단위 조각으로 나눔 (응답을 한 번에 만드는 로컬 백엔드의 스트리밍용)"""
+    return re.findall(r"\S+\s*", text)
+
+
+class SimulationBackend:
+    """시뮬레이션 응답 백엔드"""
+
+    def generate(self, message: str, model: str, system_prompt: Optional[str] = None,
+                 history: Optional[List[Dict[str, str]]] = None) -> str:
+        return f"시뮬레이션 응답: {message}에 대한 AI 답변입니다."
+
+    def stream(self, message: str, model: str, system_prompt: Optional[str] = None,
+               history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        yield from split_tokens(self.generate(message, model, system_prompt, history))
+
+
+class CommentBackend:
+    """CloudType 댓글 모드 백엔드 (시스템 프롬프트에 '댓글'이 있으면 댓글 생성)"""
+
+    def __init__(self):
+        # 키워드 → 답변 규칙은 comment_rules.json에서 한 번만 읽어 컴파일
+        self.rules = CommentRuleEngine.from_file()
+
+    def generate(self, message: str, model: str, system_prompt: Optional[str] = None,
+                 history: Optional[List[Dict[str, str]]] = None) -> str:
+        if not (system_prompt and "댓글" in system_prompt):
+            # 일반 채팅 모드
+            return f"안녕하세요! '{message}'에 대한 답변입니다. 현재는 시뮬레이션 모드로 작동하고 있습니다."
+
+        # 본문 내용에 따른 맞춤 응답
+        return self.rules.reply(message)
+
+    def stream(self, message: str, model: str, system_prompt: Optional[str] = None,
+               history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        yield from split_tokens(self.generate(message, model, system_prompt, history))
+
+
+class UpstreamBackend:
+    """공용 비동기 업스트림 엔진으로 실제 API를 호출하는 백엔드"""
+
+    def __init__(self):
+        self.engine = get_upstream_engine()
+        if self.engine is None:
+            raise ValueError("upstream 백엔드는 PUTER_UPSTREAM_URL 환경변수가 필요합니다.")
+
+    def generate(self, message: str, model: str, system_prompt: Optional[str] = None,
+                 history: Optional[List[Dict[str, str]]] = None) -> str:
+        return self.engine.chat(message, model, system_prompt, history)
+
+    def stream(self, message: str, model: str, system_prompt: Optional[str] = None,
+               history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        # 업스트림 SSE/NDJSON 응답의 조각을 도착하는 즉시 전달
+        return self.engine.stream(message, model, system_prompt, history)
+
+    def generate_many(self, requests: List[Tuple[str, str, Optional[str]]], max_concurrency: int):
+        # 배치는 요청마다 스레드를 쓰지 않고 엔진 루프에서 asyncio.gather로 동시에 처리
+        return self.engine.chat_many(requests, max_concurrency)
+
+
+class BrowserBackend:
+    """
+    헤드리스 브라우저 풀에서 puter.ai.chat을 실행해 실제 Puter 응답을 받는 백엔드
+
+    스트리밍을 지원하지 않습니다 (stream 메서드 없음). 여러 요청을 한 페이지에서 묶어 처리하므로
+    /chat/stream은 응답이 완성된 뒤 전체 텍스트를 한 조각으로 보냅니다.
+    """
+
+    def __init__(self):
+        try:
+            from puter_browser_upstream import get_browser_dispatcher
+        except ImportError as e:
+            raise ValueError(f"browser 백엔드는 selenium 패키지가 필요합니다: {e}")
+        # 브라우저는 fork 이후 첫 요청 또는 start() 때 띄움
+        self.dispatcher = get_browser_dispatcher()
+
+    def start(self):
+        self.dispatcher.start()
+
+    def close(self):
+        self.dispatcher.close()
+
+    def busy(self, count: int = 1) -> Optional[int]:
+        return self.dispatcher.busy(count)
+
+    def generate(self, message: str, model: str, system_prompt: Optional[str] = None,
+                 history: Optional[List[Dict[str, str]]] = None) -> str:
+        return self.dispatcher.chat(message, model, system_prompt, history)
+
+
+# 백엔드 이름 → 클래스 (새 백엔드는 여기에 등록)
+BACKENDS = {
+    "simulation": SimulationBackend,
+    "comment": CommentBackend,
+    "upstream": UpstreamBackend,
+    "browser": BrowserBackend
+}
+
+
+def resolve_backend_name(config: Dict[str, Any]) -> str:
+    """환경변수와 설정을 반영해 사용할 백엔드 이름 결정"""
+    if os.environ.get("PUTER_BACKEND"):
+        return os.environ["PUTER_BACKEND"]
+    if os.environ.get("PUTER_UPSTREAM_URL"):
+        return "upstream"
+    return config["backend"]
+
+
+def create_backend(name: str):
+    """이름으로 응답 백엔드 생성"""
+    if name not in BACKENDS:
+        raise ValueError(f"지원하지 않는 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+class PuterAIServer:
+    """Puter AI 서버 클래스"""
+
+    def __init__(self, backend, cache=None, models=None, metrics=METRICS, coalesce=True):
+        """
+        Args:
+            backend: generate(message, model, system_prompt, history)로 응답 텍스트를 만드는 백엔드
+                     (선택적으로 stream()은 텍스트 조각 반복자, generate_many()는 배치 동시 처리)
+            cache: 응답 캐시 (None이면 캐시 미사용)
+            models: 메트릭 레이블로 구분할 모델 목록 (그 외 모델은 "other"로 집계)
+            metrics: 메트릭 저장소
+            coalesce: 동시에 들어온 동일 요청을 업스트림 호출 하나로 합칠지 여부
+        """
+        self.backend = backend
+        self.cache = cache
+        self.models = set(models or [])
+        self.metrics = metrics
+        self.single_flight = SingleFlight() if coalesce else None
+    
+    def model_label(self, model: str) -> str:
+        """임의의 모델 이름으로 레이블 수가 늘어나지 않도록 정규화"""
+        return model if model in self.models else "other"
+
+    def chat(self, message: str, model: str = "claude-sonnet-4",
+             system_prompt: str = None, cache: str = "use",
+             history: List[Dict[str, str]] = None) -> dict:
+        """
+        AI 채팅 요청 (응답 캐시 경유)
+
+        Args:
+            message: 사용자 메시지
+            model: AI 모델
+            system_prompt: 시스템 프롬프트
+            cache: 캐시 모드 (use | bypass | refresh)
+            history: 이전 대화 턴 목록 (있으면 캐시와 요청 합치기를 건너뜀)
+
+        Returns:
+            응답 결과
+        """
+        # 대화 기록에 따라 응답이 달라지므로 메시지만으로 만든 캐시 키를 쓸 수 없음
+        if history:
+            return self.generate(message, model, system_prompt, history)
+
+        def compute():
+            # 캐시를 우회/갱신하는 요청은 항상 새로 생성
+            if cache == "use" and self.single_flight:
+                return self.generate_coalesced(message, model, system_prompt)
+            return self.generate(message, model, system_prompt)
+
+        if not self.cache:
+            return compute()
+
+        return self.cache.fetch(model, system_prompt, message, cache, compute)
+
+    def generate_coalesced(self, message: str, model: str = "claude-sonnet-4",
+                           system_prompt: str = None) -> dict:
+        """
+        AI 응답 생성 (동시에 진행 중인 동일 요청이 있으면 그 결과를 공유)
+
+        Args:
+            message: 사용자 메시지
+            model: AI 모델
+            system_prompt: 시스템 프롬프트
+
+        Returns:
+            응답 결과 (공유한 경우 "coalesced": True 포함)
+        """
+        key = make_cache_key(model, system_prompt, message)
+        result, shared = self.single_flight.do(
+            key, lambda: self.generate(message, model, system_prompt)
+        )
+
+        if shared:
+            self.metrics.inc("puter_chat_coalesced_total", {"model": self.model_label(model)})
+            return dict(result, coalesced=True)
+        return result
+
+    def busy(self, count: int = 1) -> Optional[int]:
+        """
+        백엔드가 요청 count개를 더 받을 수 없으면 Retry-After 초 (대기열이 없는 백엔드는 항상 None)
+        """
+        busy = getattr(self.backend, "busy", None)
+        return busy(count) if busy else None
+
+    def generate(self, message: str, model: str = "claude-sonnet-4",
+                 system_prompt: str = None, history: List[Dict[str, str]] = None) -> dict:
+        """
+        AI 응답 생성 (캐시 미적용)
+
+        Args:
+            message: 사용자 메시지
+            model: AI 모델
+            system_prompt: 시스템 프롬프트
+            history: 이전 대화 턴 목록
+
+        Returns:
+            응답 결과
+        """
+        start = time.perf_counter()
+        try:
+            response = self.backend.generate(message, model, system_prompt, history)
+        except Exception as e:
+            return self.failed(model, e)
+        return self.succeeded(model, response, time.perf_counter() - start)
+
+    def succeeded(self, model: str, response: str, elapsed: float) -> dict:
+        """백엔드 응답을 결과로 변환하고 소요 시간 기록"""
+        self.metrics.observe("puter_upstream_duration_seconds", {"model": self.model_label(model)}, elapsed)
+        return {
+            "success": True,
+            "response": response,
+            "model": model,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def failed(self, model: str, error: Exception) -> dict:
+        """백엔드 예외를 실패 결과로 변환하고 오류 수 기록"""
+        self.metrics.inc("puter_upstream_errors_total",
+                         {"model": self.model_label(model), "error": type(error).__name__})
+
+        if isinstance(error, UpstreamBusy):
+            # 대기열이 가득 찬 경우 라우트에서 429로 응답
+            return {
+                "success": False,
+                "error": str(error),
+                "status_code": 429,
+                "retry_after": error.retry_after
+            }
+
+        return {
+            "success": False,
+            "error": str(error)
+        }
+
+    def iter_batch(self, items: List[Dict[str, Any]], max_concurrency: int) -> Iterator[Tuple[int, dict]]:
+        """
+        배치 요청 실행
+
+        백엔드에 generate_many가 있으면 캐시에 없는 요청을 한 번에 넘겨 동시에 처리하고
+        (upstream 백엔드는 엔진 루프에서 asyncio.gather), 없으면 배치 스레드 풀에서 요청마다 chat()을 실행합니다.
+
+        Args:
+            items: parse_batch_request()로 정규화한 요청 목록
+            max_concurrency: 동시에 실행할 최대 요청 수
+
+        Yields:
+            완료되는 순서대로 (요청 인덱스, 응답 결과)
+        """
+        generate_many = getattr(self.backend, "generate_many", None)
+        if generate_many is None:
+            yield from iter_batch(
+                lambda item: self.chat(item['message'], item['model'], item['system_prompt'], item['cache']),
+                items, max_concurrency
+            )
+            return
+
+        # (요청 인덱스 목록, 요청, 캐시 키) - 배치 안의 동일 요청은 한 번만 생성해 결과를 공유
+        misses = []
+        shared = {}
+        for index, item in enumerate(items):
+            key = None
+            if self.cache:
+                key, cached = self.cache.lookup(item['model'], item['system_prompt'], item['message'], item['cache'])
+                if cached is not None:
+                    yield index, cached
+                    continue
+
+            if item['cache'] == "use" and self.single_flight:
+                shared_key = make_cache_key(item['model'], item['system_prompt'], item['message'])
+                if shared_key in shared:
+                    shared[shared_key][0].append(index)
+                    self.metrics.inc("puter_chat_coalesced_total", {"model": self.model_label(item['model'])})
+                    continue
+                shared[shared_key] = ([index], item, key)
+                misses.append(shared[shared_key])
+            else:
+                misses.append(([index], item, key))
+
+        if not misses:
+            return
+
+        def fan_out(indexes, result):
+            yield indexes[0], result
+            for index in indexes[1:]:
+                yield index, dict(result, coalesced=True)
+
+        requests = [(item['message'], item['model'], item['system_prompt']) for _, item, _ in misses]
+        remaining = set(range(len(misses)))
+        try:
+            # 클라이언트가 NDJSON 응답 도중 연결을 끊으면 진행 중인 업스트림 요청도 취소
+            with closing(generate_many(requests, max_concurrency)) as outcomes:
+                for position, outcome, elapsed in outcomes:
+                    remaining.discard(position)
+                    indexes, item, key = misses[position]
+                    if isinstance(outcome, Exception):
+                        yield from fan_out(indexes, self.failed(item['model'], outcome))
+                        continue
+
+                    result = self.succeeded(item['model'], outcome, elapsed)
+                    if self.cache:
+                        self.cache.store(key, result)
+                    yield from fan_out(indexes, result)
+
+        except UpstreamError as e:
+            # 시간 초과 등으로 배치가 중단되면 남은 요청은 실패로 반환
+            for position in sorted(remaining):
+                indexes, item, _ = misses[position]
+                yield from fan_out(indexes, self.failed(item['model'], e))
+
+    def run_batch(self, items: List[Dict[str, Any]], max_concurrency: int) -> List[dict]:
+        """배치 요청 실행 (요청 순서대로 결과 반환)"""
+        results = [None] * len(items)
+        for index, result in self.iter_batch(items, max_concurrency):
+            results[index] = result
+        return results
+
+    def chat_stream(self, message: str, model: str = "claude-sonnet-4",
+                    system_prompt: str = None, cache: str = "use",
+                    history: List[Dict[str, str]] = None):
+        """
+        AI 채팅 스트리밍 요청
+
+        Args:
+            message: 사용자 메시지
+            model: AI 모델
+            system_prompt: 시스템 프롬프트
+            cache: 캐시 모드 (use | bypass | refresh)
+            history: 이전 대화 턴 목록
+
+        Yields:
+            백엔드가 생성하는 대로 응답 텍스트 조각 (캐시 적중이면 전체 응답 한 조각)
+        """
+        stream = getattr(self.backend, "stream", None)
+        if stream is None:
+            # 스트리밍을 지원하지 않는 백엔드는 완성된 응답을 한 조각으로 전달
+            result = self.chat(message, model, system_prompt, cache, history)
+            if not result.get("success"):
+                raise RuntimeError(result.get("error", "알 수 없는 오류"))
+            yield result["response"]
+            return
+
+        # 진행 중인 스트림은 다른 요청과 공유할 수 없으므로 요청 합치기 없이 캐시만 확인
+        key = None
+        if self.cache and not history:
+            key, cached = self.cache.lookup(model, system_prompt, message, cache)
+            if cached is not None:
+                yield cached["response"]
+                return
+
+        parts = []
+        start = time.perf_counter()
+        try:
+            # 클라이언트가 연결을 끊어 중간에 닫혀도 업스트림 스트림까지 닫음
+            with closing(stream(message, model, system_prompt, history)) as tokens:
+                for token in tokens:
+                    parts.append(token)
+                    yield token
+        except Exception as e:
+            self.failed(model, e)
+            raise
+
+        result = self.succeeded(model, "".join(parts), time.perf_counter() - start)
+        if key:
+            self.cache.store(key, result)
+
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Server-Sent Events 형식의 이벤트 문자열 생성"""
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+
+def parse_cache_mode(data: dict):
+    """요청의 캐시 모드 검증 (잘못된 값이면 400 응답 반환)"""
+    cache_mode = data.get('cache', 'use')
+    if cache_mode not in CACHE_MODES:
+        return None, (jsonify({
+            "success": False,
+            "error": f"cache는 {', '.join(CACHE_MODES)} 중 하나여야 합니다."
+        }), 400)
+    return cache_mode, None
+
+
+def busy_response(retry_after: int):
+    """백엔드 대기열이 가득 찼을 때의 429 응답 (/chat의 UpstreamBusy 응답과 같은 형식)"""
+    return jsonify({
+        "success": False,
+        "error": "요청 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.",
+        "status_code": 429,
+        "retry_after": retry_after
+    }), 429, {"Retry-After": str(retry_after)}
+
+
+def create_app(config: Dict[str, Any] = None) -> Flask:
+    """
+    Puter AI Flask 앱 생성
+
+    Args:
+        config: DEFAULT_CONFIG를 덮어쓸 설정 (backend, service, version, html_template 등)
+
+    Returns:
+        라우트가 등록된 Flask 앱 (app.extensions["puter"]에 PuterAIServer 보관)
+    """
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+
+    app = Flask(__name__)
+    app.config["PUTER"] = config
+
+    puter_server = PuterAIServer(
+        create_backend(resolve_backend_name(config)),
+        get_response_cache(),
+        config["models"],
+        coalesce=os.environ.get("PUTER_COALESCE", "1") != "0"
+    )
+    app.extensions["puter"] = puter_server
+
+    # 서버 측 대화 세션 (클라이언트는 conversation_id와 새 메시지만 전송)
+    conversations = get_conversation_store()
+    app.extensions["puter_conversations"] = conversations
+    # 대화 기록을 모델별 토큰 예산 안으로 자르거나 요약
+    context_manager = get_context_manager()
+
+    # 메인 페이지는 변수가 없으므로 시작 시 한 번만 렌더링하고 압축해 둠
+    with app.app_context():
+        index_page = StaticPage(render_template_string(config["html_template"]))
+
+    # 저장소에 포함된 정적 채팅 페이지
+    static_pages = load_static_pages(config["static_pages"])
+
+    def resolve_conversation(data: dict):
+        """
+        요청의 대화 세션 확인
+
+        conversation_id가 있으면 그 대화의 기록을, "conversation": true면 새 대화를 사용합니다.
+        기록은 모델의 토큰 예산에 맞게 잘라서 반환합니다.
+
+        Returns:
+            (대화 ID, 이전 대화 기록, 컨텍스트 통계, 오류 응답) - 대화를 사용하지 않으면 오류 외에는 None
+        """
+        conversation_id = data.get('conversation_id')
+        if conversation_id is None:
+            if data.get('conversation'):
+                return conversations.create(), None, None, None
+            return None, None, None, None
+
+        conversation_id = str(conversation_id)
+        turns = conversations.turns(conversation_id)
+        if turns is None:
+            return None, None, None, (jsonify({
+                "success": False,
+                "error": "대화를 찾을 수 없습니다."
+            }), 404)
+
+        history, context = context_manager.build(
+            conversation_id, turns, data.get('model', 'claude-sonnet-4'),
+            data.get('system_prompt'), str(data['message'])
+        )
+        return conversation_id, history, context, None
+
+    def stream_chat_response(message: str, model: str, system_prompt: str = None,
+                             cache_mode: str = "use", conversation_id: str = None,
+                             history: List[Dict[str, str]] = None) -> Response:
+        """토큰을 생성되는 즉시 SSE로 전송하는 응답 생성"""
+        def generate():
+            try:
+                tokens = []
+                for token in puter_server.chat_stream(message, model, system_prompt, cache_mode, history):
+                    tokens.append(token)
+                    yield sse_event({"token": token})
+
+                done = {
+                    "success": True,
+                    "model": model,
+                    "timestamp": datetime.now().isoformat()
+                }
+                if conversation_id:
+                    conversations.append(conversation_id, ("user", message), ("assistant", "".join(tokens)))
+                    done["conversation_id"] = conversation_id
+                yield sse_event(done, event="done")
+            except Exception as e:
+                record_error(e)
+                yield sse_event({"success": False, "error": str(e)}, event="error")
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                # 리버스 프록시(nginx 등)의 응답 버퍼링 비활성화
+                "X-Accel-Buffering": "no"
+            }
+        )
+
+    def route_label() -> str:
+        # 경로 변수로 레이블 수가 늘어나지 않도록 URL 규칙을 사용
+        return request.url_rule.rule if request.url_rule else "unmatched"
+
+    def record_error(e: Exception):
+        """라우트에서 잡아 오류 응답으로 바꾼 예외 기록 (잡히지 않은 예외는 teardown에서 기록)"""
+        METRICS.inc("puter_http_errors_total", {"route": route_label(), "error": type(e).__name__})
+
+    @app.before_request
+    def start_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_route = route_label()
+        METRICS.inc("puter_http_requests_in_flight", {"route": g.metrics_route})
+
+    @app.after_request
+    def record_metrics(response):
+        route = g.get("metrics_route", route_label())
+        elapsed = time.perf_counter() - g.get("metrics_start", time.perf_counter())
+
+        METRICS.inc("puter_http_requests_total", {
+            "route": route, "method": request.method, "status": str(response.status_code)
+        })
+        METRICS.observe("puter_http_request_duration_seconds", {"route": route}, elapsed)
+
+        if request.content_length:
+            METRICS.observe("puter_http_request_size_bytes", {"route": route},
+                            request.content_length, SIZE_BUCKETS)
+        if response.content_length is not None and not response.is_streamed:
+            METRICS.observe("puter_http_response_size_bytes", {"route": route},
+                            response.content_length, SIZE_BUCKETS)
+
+        if g.get("model"):
+            METRICS.observe("puter_chat_duration_seconds",
+                            {"model": puter_server.model_label(g.model)}, elapsed)
+        return response
+
+    @app.teardown_request
+    def finish_metrics(exc):
+        if "metrics_route" in g:
+            METRICS.inc("puter_http_requests_in_flight", {"route": g.metrics_route}, -1)
+        if exc is not None:
+            METRICS.inc("puter_http_errors_total", {"route": route_label(), "error": type(exc).__name__})
+
+    @app.route('/')
+    def index():
+        """메인 페이지"""
+        return index_page.response()
+
+    @app.route('/<name>.html')
+    def static_page(name):
+        """정적 채팅 페이지"""
+        page = static_pages.get(f"{name}.html")
+        if page is None:
+            return jsonify({
+                "success": False,
+                "error": "페이지를 찾을 수 없습니다."
+            }), 404
+        return page.response()
+
+    @app.route('/chat', methods=['POST'])
+    def chat():
+        """AI 채팅 API 엔드포인트"""
+        try:
+            data = request.get_json()
+
+            if not data or 'message' not in data:
+                return jsonify({
+                    "success": False,
+                    "error": "메시지가 필요합니다."
+                }), 400
+
+            message = data['message']
+            model = data.get('model', 'claude-sonnet-4')
+            system_prompt = data.get('system_prompt')
+            g.model = model
+            cache_mode, error = parse_cache_mode(data)
+            if error:
+                return error
+
+            conversation_id, history, context, error = resolve_conversation(data)
+            if error:
+                return error
+
+            # 스트리밍 요청은 SSE로 응답 (응답을 시작한 뒤에는 429를 보낼 수 없으므로 미리 확인)
+            if data.get('stream'):
+                retry_after = puter_server.busy()
+                if retry_after is not None:
+                    return busy_response(retry_after)
+                return stream_chat_response(message, model, system_prompt, cache_mode,
+                                            conversation_id, history)
+
+            # AI 응답 요청
+            result = puter_server.chat(message, model, system_prompt, cache_mode, history)
+
+            if conversation_id:
+                if result.get("success"):
+                    conversations.append(conversation_id, ("user", message), ("assistant", result["response"]))
+                result = dict(result, conversation_id=conversation_id)
+                if context:
+                    result["context"] = context
+
+            if result.get("status_code") == 429:
+                return jsonify(result), 429, {"Retry-After": str(result["retry_after"])}
+
+            return jsonify(result)
+
+        except Exception as e:
+            record_error(e)
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 500
+
+    @app.route('/chat/stream', methods=['POST'])
+    def chat_stream():
+        """AI 채팅 스트리밍 API 엔드포인트 (Server-Sent Events)"""
+        try:
+            data = request.get_json()
+
+            if not data or 'message' not in data:
+                return jsonify({
+                    "success": False,
+                    "error": "메시지가 필요합니다."
+                }), 400
+
+            g.model = data.get('model', 'claude-sonnet-4')
+            cache_mode, error = parse_cache_mode(data)
+            if error:
+                return error
+
+            conversation_id, history, _, error = resolve_conversation(data)
+            if error:
+                return error
+
+            # 응답을 시작한 뒤에는 429를 보낼 수 없으므로 미리 확인
+            retry_after = puter_server.busy()
+            if retry_after is not None:
+                return busy_response(retry_after)
+
+            return stream_chat_response(
+                data['message'],
+                data.get('model', 'claude-sonnet-4'),
+                data.get('system_prompt'),
+                cache_mode,
+                conversation_id,
+                history
+            )
+
+        except Exception as e:
+            record_error(e)
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 500
+
+    @app.route('/chat/batch', methods=['POST'])
+    def chat_batch():
+        """AI 채팅 일괄 처리 API 엔드포인트 (제한된 동시성으로 병렬 처리)"""
+        try:
+            data = request.get_json()
+
+            try:
+                items, max_concurrency = parse_batch_request(data)
+            except ValueError as e:
+                return jsonify({
+                    "success": False,
+                    "error": str(e)
+                }), 400
+
+            # 배치는 최대 max_concurrency개씩 백엔드 대기열에 들어감
+            retry_after = puter_server.busy(min(len(items), max_concurrency))
+            if retry_after is not None:
+                return busy_response(retry_after)
+
+            # 스트리밍 요청은 완료되는 순서대로 NDJSON 한 줄씩 전송
+            if data.get('stream'):
+                def generate():
+                    for index, result in puter_server.iter_batch(items, max_concurrency):
+                        yield json.dumps(dict(result, index=index), ensure_ascii=False) + "\n"
+
+                return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+            results = puter_server.run_batch(items, max_concurrency)
+
+            return jsonify({
+                "success": True,
+                "count": len(results),
+                "results": results
+            })
+
+        except Exception as e:
+            record_error(e)
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 500
+
+    @app.route('/conversations', methods=['POST'])
+    def create_conversation():
+        """새 대화 세션 생성"""
+        return jsonify({
+            "success": True,
+            "conversation_id": conversations.create()
+        }), 201
+
+    @app.route('/conversations/<conversation_id>', methods=['GET', 'DELETE'])
+    def conversation(conversation_id):
+        """대화 기록 조회/삭제"""
+        if request.method == 'DELETE':
+            if not conversations.delete(conversation_id):
+                return jsonify({
+                    "success": False,
+                    "error": "대화를 찾을 수 없습니다."
+                }), 404
+            return jsonify({"success": True})
+
+        history = conversations.history(conversation_id)
+        if history is None:
+            return jsonify({
+                "success": False,
+                "error": "대화를 찾을 수 없습니다."
+            }), 404
+
+        return jsonify({
+            "success": True,
+            "conversation_id": conversation_id,
+            "messages": history
+        })
+
+    @app.route('/health')
+    def health():
+        """서버 상태 확인"""
+        status = {
+            "status": "healthy",
+            "timestamp": datetime.now().isoformat(),
+            "service": config["service"]
+        }
+
+        if config["version"]:
+            status["version"] = config["version"]
+
+        if puter_server.cache:
+            status["cache"] = puter_server.cache.stats()
+
+        if puter_server.single_flight:
+            status["coalescing"] = puter_server.single_flight.stats()
+
+        if isinstance(puter_server.backend, BrowserBackend):
+            status["browser"] = puter_server.backend.dispatcher.stats()
+
+        status["conversations"] = conversations.stats()
+
+        return jsonify(status)
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus 형식 메트릭"""
+        extra = []
+        if puter_server.cache:
+            stats = puter_server.cache.stats()
+            for name, help_text in (("hits", "적중"), ("misses", "실패"), ("bypass", "우회")):
+                extra.append((f"puter_cache_{name}_total", "counter", f"응답 캐시 {help_text} 수", {}, stats[name]))
+            extra.append(("puter_cache_entries", "gauge", "메모리 응답 캐시 항목 수", {}, stats["size"]))
+
+        return Response(METRICS.render(extra), mimetype="text/plain; version=0.0.4")
+
+    @app.route('/models')
+    def models():
+        """사용 가능한 모델 목록"""
+        return jsonify({
+            "models": config["models"]
+        })
+
+    return app
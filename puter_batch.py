@@ -0,0 +1,121 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Any, Iterator, List, Tuple
+
+from puter_cache import CACHE_MODES
+
+# 배치 한 번에 허용하는 최대 요청 수
+MAX_BATCH_SIZE = int(os.environ.get("PUTER_BATCH_MAX_SIZE", 1000))
+# 배치 하나가 동시에 실행할 수 있는 기본/최대 요청 수
+DEFAULT_CONCURRENCY = int(os.environ.get("PUTER_BATCH_CONCURRENCY", 16))
+MAX_CONCURRENCY = int(os.environ.get("PUTER_BATCH_MAX_CONCURRENCY", 64))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_batch_executor() -> ThreadPoolExecutor:
+    """배치 요청이 공유하는 프로세스 공용 스레드 풀"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.environ.get("PUTER_BATCH_WORKERS", MAX_CONCURRENCY)),
+                thread_name_prefix="puter-batch"
+            )
+        return _executor
+
+
+def parse_batch_request(data: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    배치 요청 본문 검증 및 정규화
+
+    "requests"(요청 객체 목록) 또는 "messages"(메시지 문자열 목록)를 받습니다.
+    개별 요청에 없는 model/system_prompt/cache는 배치 최상위 값을 기본값으로 사용합니다.
+
+    Returns:
+        (정규화된 요청 목록, 동시 실행 수)
+
+    Raises:
+        ValueError: 요청 형식이 올바르지 않은 경우
+    """
+    if not data:
+        raise ValueError("요청 본문이 필요합니다.")
+
+    raw_items = data.get("requests")
+    if raw_items is None and "messages" in data:
+        raw_items = [{"message": message} for message in data["messages"]]
+
+    if not isinstance(raw_items, list) or not raw_items:
+        raise ValueError("requests 또는 messages 배열이 필요합니다.")
+
+    if len(raw_items) > MAX_BATCH_SIZE:
+        raise ValueError(f"배치 크기는 최대 {MAX_BATCH_SIZE}개입니다.")
+
+    defaults = {
+        "model": data.get("model", "claude-sonnet-4"),
+        "system_prompt": data.get("system_prompt"),
+        "cache": data.get("cache", "use")
+    }
+
+    items = []
+    for index, raw in enumerate(raw_items):
+        if not isinstance(raw, dict) or "message" not in raw:
+            raise ValueError(f"{index}번 요청에 메시지가 필요합니다.")
+
+        cache = raw.get("cache", defaults["cache"])
+        if cache not in CACHE_MODES:
+            raise ValueError(f"{index}번 요청의 cache는 {', '.join(CACHE_MODES)} 중 하나여야 합니다.")
+
+        items.append({
+            "message": raw["message"],
+            "model": raw.get("model", defaults["model"]),
+            "system_prompt": raw.get("system_prompt", defaults["system_prompt"]),
+            "cache": cache
+        })
+
+    try:
+        concurrency = int(data.get("max_concurrency", DEFAULT_CONCURRENCY))
+    except (TypeError, ValueError):
+        raise ValueError("max_concurrency는 정수여야 합니다.")
+
+    return items, max(1, min(concurrency, MAX_CONCURRENCY))
+
+
+def iter_batch(chat_fn: Callable[[Dict[str, Any]], Dict[str, Any]],
+               items: List[Dict[str, Any]],
+               max_concurrency: int = DEFAULT_CONCURRENCY) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    요청을 제한된 동시성으로 실행하고 완료되는 순서대로 반환
+
+    Args:
+        chat_fn: 요청 하나를 처리하는 함수
+        items: 정규화된 요청 목록
+        max_concurrency: 동시에 실행할 최대 요청 수
+
+    Yields:
+        (요청 인덱스, 응답 결과)
+    """
+    executor = get_batch_executor()
+    pending = {}
+    next_index = 0
+
+    def call(item):
+        try:
+            return chat_fn(item)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    while next_index < len(items) or pending:
+        # 동시 실행 한도까지 새 요청 투입
+        while next_index < len(items) and len(pending) < max_concurrency:
+            future = executor.submit(call, items[next_index])
+            pending[future] = next_index
+            next_index += 1
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future.result()
+
@@ -0,0 +1,232 @@
+import math
+import os
+import queue
+import threading
+import time
+from typing import List, Dict, Any, Optional, Union
+
+from puter_selenium_client import PuterBrowserPool, BrowserPoolError
+from puter_upstream import UpstreamError, UpstreamBusy
+
+
+def build_prompt(message: str, system_prompt: Optional[str] = None,
+                 history: Optional[List[Dict[str, str]]] = None) -> Union[str, List[Dict[str, str]]]:
+    """puter.ai.chat에 전달할 프롬프트 (시스템 프롬프트/대화 기록이 있으면 메시지 목록)"""
+    if not system_prompt and not history:
+        return message
+
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.extend(history or [])
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+class _Job:
+    """대기열에 들어가는 채팅 작업 하나"""
+
+    __slots__ = ("prompt", "model", "deadline", "done", "result", "error", "cancelled")
+
+    def __init__(self, prompt, model: str, deadline: float):
+        self.prompt = prompt
+        self.model = model
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.cancelled = False
+
+    def finish(self, result: str = None, error: Exception = None):
+        self.result = result
+        self.error = error
+        self.done.set()
+
+
+class BrowserDispatcher:
+    """
+    헤드리스 브라우저 풀에서 puter.ai.chat을 실행하는 작업 디스패처
+
+    요청은 크기가 제한된 대기열에 들어가고, 브라우저마다 하나씩 있는 작업 스레드가
+    대기 중인 요청을 최대 batch_size개씩 묶어 한 페이지에서 동시에 처리합니다.
+    대기열이 가득 차면 기다리지 않고 UpstreamBusy를 발생시킵니다 (429 응답).
+    """
+
+    def __init__(self, pool_size: int = 2, queue_size: int = 256, batch_size: int = 4,
+                 timeout: float = 60, headless: bool = True, max_requests: int = 200,
+                 max_memory_mb: int = 512):
+        """
+        Args:
+            pool_size: 브라우저(작업 스레드) 수
+            queue_size: 최대 대기 작업 수
+            batch_size: 브라우저 하나가 한 번에 처리할 최대 작업 수
+            timeout: 작업 하나의 제한 시간 (대기열 대기 포함, 초)
+            headless: 헤드리스 모드 여부
+            max_requests: 브라우저 교체 전 최대 처리 횟수
+            max_memory_mb: 페이지 JS 힙이 이 크기(MB)를 넘으면 브라우저 교체
+        """
+        # 브라우저는 작업 스레드만 사용하므로 풀의 대기 수는 스레드 수로 충분
+        self.pool = PuterBrowserPool(
+            size=pool_size, headless=headless, max_requests=max_requests,
+            max_memory_mb=max_memory_mb, timeout=timeout, max_waiting=pool_size
+        )
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._workers = []
+        self._closed = False
+        # 작업 하나의 평균 처리 시간 (Retry-After 추정용)
+        self._avg_seconds = 1.0
+
+    def start(self):
+        """브라우저와 작업 스레드 시작 (이미 시작했으면 무시, fork 이후 워커에서 호출)"""
+        with self._lock:
+            if self._workers or self._closed:
+                return
+            self.pool.start(wait=False)
+            for i in range(self.pool.size):
+                worker = threading.Thread(target=self._work, name=f"browser-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+
+            # 이미 쌓여 있는 작업을 함께 꺼내 한 페이지에서 동시에 처리
+            batch = [job]
+            while len(batch) < self.batch_size:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self.jobs.put(None)
+                    break
+                batch.append(job)
+
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_Job]):
+        now = time.monotonic()
+        by_model = {}
+        for job in batch:
+            if job.cancelled or job.deadline <= now:
+                job.finish(error=UpstreamError("브라우저 작업 대기 시간 초과"))
+            else:
+                by_model.setdefault(job.model, []).append(job)
+
+        for model, jobs in by_model.items():
+            start = time.monotonic()
+            try:
+                results = self.pool.chat_many(
+                    [job.prompt for job in jobs], model,
+                    max(1.0, max(job.deadline for job in jobs) - start)
+                )
+            except BrowserPoolError as e:
+                for job in jobs:
+                    job.finish(error=UpstreamError(str(e)))
+                continue
+
+            elapsed = (time.monotonic() - start) / len(jobs)
+            self._avg_seconds = self._avg_seconds * 0.9 + elapsed * 0.1
+
+            for job, result in zip(jobs, results):
+                if result["success"]:
+                    job.finish(result=result["text"])
+                else:
+                    job.finish(error=UpstreamError(f"Puter 오류: {result['error']}"))
+
+    def retry_after(self) -> int:
+        """대기열이 비워질 때까지 예상 시간 (초)"""
+        throughput = self.pool.size * self.batch_size / max(self._avg_seconds, 0.001)
+        return max(1, math.ceil(self.jobs.qsize() / throughput))
+
+    def busy(self, count: int = 1) -> Optional[int]:
+        """
+        작업 count개를 더 받을 자리가 없으면 Retry-After 초 (자리가 있으면 None)
+
+        스트리밍/배치 요청이 응답을 시작하기 전에 429로 거절할 수 있도록 미리 확인합니다.
+        """
+        if self.jobs.qsize() + count > self.jobs.maxsize:
+            return self.retry_after()
+        return None
+
+    def chat(self, message: str, model: str = "claude-sonnet-4", system_prompt: Optional[str] = None,
+             history: Optional[List[Dict[str, str]]] = None) -> str:
+        """
+        브라우저에서 puter.ai.chat 실행
+
+        Args:
+            message: 사용자 메시지
+            model: AI 모델
+            system_prompt: 시스템 프롬프트
+            history: 이전 대화 턴 목록
+
+        Returns:
+            AI 응답 텍스트
+
+        Raises:
+            UpstreamBusy: 대기열이 가득 참
+            UpstreamError: 시간 초과 또는 브라우저/Puter 오류
+        """
+        self.start()
+        job = _Job(build_prompt(message, system_prompt, history), model, time.monotonic() + self.timeout)
+
+        try:
+            self.jobs.put_nowait(job)
+        except queue.Full:
+            raise UpstreamBusy("브라우저 작업 대기열이 가득 찼습니다.", retry_after=self.retry_after())
+
+        if not job.done.wait(self.timeout):
+            # 아직 시작하지 않은 작업이면 작업 스레드가 건너뜀
+            job.cancelled = True
+            raise UpstreamError("브라우저 응답 시간 초과")
+
+        if job.error:
+            raise job.error
+        return job.result
+
+    def stats(self) -> Dict[str, Any]:
+        """대기열/브라우저 풀 상태"""
+        return {
+            "queued": self.jobs.qsize(),
+            "queue_size": self.jobs.maxsize,
+            "avg_job_seconds": round(self._avg_seconds, 3),
+            "pool": self.pool.stats()
+        }
+
+    def close(self):
+        """대기 중인 작업을 실패 처리하고 브라우저 종료"""
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.finish(error=UpstreamError("브라우저 백엔드가 종료되었습니다."))
+
+        for _ in workers:
+            self.jobs.put(None)
+        self.pool.close()
+
+
+def get_browser_dispatcher() -> BrowserDispatcher:
+    """환경변수 설정으로 브라우저 디스패처 생성 (브라우저는 첫 요청 또는 start() 때 시작)"""
+    return BrowserDispatcher(
+        pool_size=int(os.environ.get("PUTER_BROWSER_POOL_SIZE", 2)),
+        queue_size=int(os.environ.get("PUTER_BROWSER_QUEUE_SIZE", 256)),
+        batch_size=int(os.environ.get("PUTER_BROWSER_BATCH_SIZE", 4)),
+        timeout=float(os.environ.get("PUTER_BROWSER_TIMEOUT", 60)),
+        headless=os.environ.get("PUTER_BROWSER_HEADLESS", "1") != "0",
+        max_requests=int(os.environ.get("PUTER_BROWSER_MAX_REQUESTS", 200)),
+        max_memory_mb=int(os.environ.get("PUTER_BROWSER_MAX_MEMORY_MB", 512))
+    )
@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Tuple
+
+# 요청별 캐시 제어 모드
+CACHE_MODES = ("use", "bypass", "refresh")
+
+
+def make_cache_key(model: str, system_prompt: Optional[str], message: str) -> str:
+    """
+    (모델, 시스템 프롬프트, 메시지)를 정규화한 해시 키 생성
+
+    유니코드 정규화(NFC)와 공백 정리를 거치므로 공백/줄바꿈만 다른 요청은 같은 키가 됩니다.
+    """
+    def normalize(text):
+        text = unicodedata.normalize("NFC", text or "")
+        return " ".join(text.split())
+
+    raw = "\x1f".join([normalize(model), normalize(system_prompt), normalize(message)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """TTL이 있는 프로세스 내 LRU 캐시"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600):
+        """
+        Args:
+            max_entries: 최대 항목 수
+            ttl: 항목 유효 시간 (초)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    프로세스 간에 공유되는 디스크 캐시 (SQLite)
+
+    purge_every번 쓸 때마다 만료된 항목을 지우고, 항목이 max_rows개를 넘으면
+    가장 오래 읽히지 않은 항목부터 삭제합니다.
+    """
+
+    def __init__(self, path: str, ttl: float = 86400, max_rows: int = 100000, purge_every: int = 100):
+        """
+        Args:
+            path: SQLite 데이터베이스 파일 경로
+            ttl: 항목 유효 시간 (초)
+            max_rows: 최대 항목 수 (0이면 제한 없음)
+            purge_every: 정리 주기 (쓰기 횟수)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, accessed REAL)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(responses)")]
+            if "accessed" not in columns:
+                # accessed가 없던 이전 버전 파일
+                conn.execute("ALTER TABLE responses ADD COLUMN accessed REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 커넥션은 스레드 간 공유하지 않고 스레드마다 하나씩 사용
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            "SELECT value, expires FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+
+        # 디스크에서 읽는 것은 메모리 캐시에 없을 때뿐이므로 적중 시에만 사용 시각 갱신
+        with self._connect() as conn:
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + self.ttl, now)
+            )
+
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self.purge()
+
+    def purge(self):
+        """만료된 항목을 삭제하고 max_rows를 넘는 항목은 오래 읽히지 않은 것부터 삭제"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE expires < ?", (time.time(),))
+            if self.max_rows:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                    "ORDER BY accessed LIMIT MAX(0, (SELECT COUNT(*) FROM responses) - ?))",
+                    (self.max_rows,)
+                )
+
+
+class ResponseCache:
+    """
+    PuterAIServer.chat 앞단의 응답 캐시
+
+    메모리 LRU를 먼저 확인하고, 없으면 선택적인 디스크 캐시를 확인합니다.
+    디스크에서 찾은 항목은 메모리로 승격됩니다.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "bypass": 0}
+
+    def _count(self, *names):
+        with self._lock:
+            for name in names:
+                self._stats[name] += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits", "memory_hits")
+            return value
+
+        if self.disk:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                self._count("hits", "disk_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        self.memory.set(key, value)
+        if self.disk:
+            self.disk.set(key, value)
+
+    def fetch(self, model: str, system_prompt: Optional[str], message: str,
+              mode: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        캐시를 거쳐 응답 반환
+
+        Args:
+            model: AI 모델
+            system_prompt: 시스템 프롬프트
+            message: 사용자 메시지
+            mode: use(캐시 사용) | bypass(캐시 무시) | refresh(새로 생성 후 저장)
+            compute: 캐시에 없을 때 응답을 생성하는 함수
+
+        Returns:
+            응답 결과 (캐시 적중 시 "cached": True 포함)
+        """
+        key, cached = self.lookup(model, system_prompt, message, mode)
+        if cached is not None:
+            return cached
+
+        result = compute()
+        self.store(key, result)
+        return result
+
+    def lookup(self, model: str, system_prompt: Optional[str], message: str,
+               mode: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        캐시 모드에 따라 캐시 확인 (응답을 직접 생성하는 배치/스트리밍 경로용)
+
+        Returns:
+            (store()에 넘길 캐시 키 - bypass면 None, 캐시된 응답 - 없으면 None)
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"지원하지 않는 캐시 모드: {mode}")
+
+        if mode == "bypass":
+            self._count("bypass")
+            return None, None
+
+        key = make_cache_key(model, system_prompt, message)
+
+        if mode == "use":
+            cached = self.get(key)
+            if cached is not None:
+                return key, dict(cached, cached=True)
+
+        return key, None
+
+    def store(self, key: Optional[str], result: Dict[str, Any]):
+        """lookup()에서 받은 키로 응답 저장 (키가 없거나 실패한 응답은 저장하지 않음)"""
+        if key is not None and result.get("success"):
+            self.set(key, result)
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/실패 카운터"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["size"] = len(self.memory)
+        stats["disk"] = bool(self.disk)
+        return stats
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    환경변수 설정으로 응답 캐시 생성
+
+    PUTER_CACHE_SIZE가 0이면 캐시를 사용하지 않습니다 (None 반환).
+    PUTER_CACHE_DB가 설정되면 SQLite 디스크 캐시를 함께 사용합니다.
+    """
+    max_entries = int(os.environ.get("PUTER_CACHE_SIZE", 1024))
+    if max_entries <= 0:
+        return None
+
+    ttl = float(os.environ.get("PUTER_CACHE_TTL", 3600))
+    db_path = os.environ.get("PUTER_CACHE_DB")
+
+    disk = SQLiteCache(
+        db_path,
+        ttl=float(os.environ.get("PUTER_CACHE_DB_TTL", 86400)),
+        max_rows=int(os.environ.get("PUTER_CACHE_DB_MAX_ROWS", 100000))
+    ) if db_path else None
+    return ResponseCache(LRUCache(max_entries, ttl), disk)
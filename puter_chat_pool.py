@@ -0,0 +1,213 @@
+import functools
+import os
+import threading
+from typing import Hashable, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class WorkerSignals(QObject):
+    """
+    작업 결과를 GUI 스레드로 전달하는 시그널 객체
+
+    작업 스레드는 _result/_chunk/_error를 보내고, GUI 스레드에서 취소 여부를 확인한 뒤
+    result/chunk/error로 다시 보냅니다. 취소도 GUI 스레드에서 하므로 취소한 요청의
+    결과가 이미 이벤트 큐에 들어가 있어도 화면에 나타나지 않습니다.
+    finished는 취소 여부와 관계없이 앞의 시그널들이 모두 전달된 뒤 GUI 스레드에서 보냅니다.
+    """
+
+    result = pyqtSignal(str)
+    chunk = pyqtSignal(str)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    _result = pyqtSignal(str)
+    _chunk = pyqtSignal(str)
+    _error = pyqtSignal(str)
+    _finished = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.cancelled = False
+        self._result.connect(self._relay_result)
+        self._chunk.connect(self._relay_chunk)
+        self._error.connect(self._relay_error)
+        self._finished.connect(self._relay_finished)
+
+    @pyqtSlot(str)
+    def _relay_result(self, text):
+        if not self.cancelled:
+            self.result.emit(text)
+
+    @pyqtSlot(str)
+    def _relay_chunk(self, text):
+        if not self.cancelled:
+            self.chunk.emit(text)
+
+    @pyqtSlot(str)
+    def _relay_error(self, message):
+        if not self.cancelled:
+            self.error.emit(message)
+
+    @pyqtSlot()
+    def _relay_finished(self):
+        self.finished.emit()
+
+
+class PooledWorker(QRunnable):
+    """
+    ChatExecutor에서 실행하는 요청 작업 (GUI 스레드에서 생성)
+
+    하위 클래스는 execute()에서 self.result/self.chunk/self.error.emit()으로 결과를 보내고,
+    화면 쪽은 worker.signals의 같은 이름 시그널에 연결합니다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # 실행이 끝나도 Qt가 지우지 않도록 함 (파이썬 객체는 ChatExecutor가 보관)
+        self.setAutoDelete(False)
+        self.signals = WorkerSignals()
+
+    @property
+    def result(self):
+        return self.signals._result
+
+    @property
+    def chunk(self):
+        return self.signals._chunk
+
+    @property
+    def error(self):
+        return self.signals._error
+
+    def is_cancelled(self) -> bool:
+        return self.signals.cancelled
+
+    def cancel(self):
+        """이후 결과를 무시 (GUI 스레드에서 호출)"""
+        self.signals.cancelled = True
+
+    def execute(self):
+        raise NotImplementedError
+
+    def run(self):
+        try:
+            if not self.is_cancelled():
+                self.execute()
+        finally:
+            # 작업 정리는 GUI 스레드에서 (결과 시그널이 전달된 뒤 ChatExecutor가 처리)
+            self.signals._finished.emit()
+
+
+class ChatExecutor(QObject):
+    """
+    채팅 요청 실행기
+
+    요청마다 스레드를 만들지 않고 QThreadPool의 스레드를 재사용합니다.
+    대기 중인 요청 수에 한도가 있어 넘치면 submit()이 False를 반환하고,
+    같은 대화(key)에 새 요청이 들어오면 이전 요청을 취소하므로 여러 대화를 동시에 처리하면서도
+    한 대화에는 최신 요청 하나만 남습니다.
+    """
+
+    def __init__(self, max_threads: int = 4, max_queued: int = 16, parent=None):
+        """
+        Args:
+            max_threads: 동시에 실행할 최대 요청 수
+            max_queued: 실행을 기다릴 수 있는 최대 요청 수
+            parent: 부모 QObject (GUI 스레드에서 생성해야 함)
+        """
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.max_pending = max_threads + max_queued
+
+        self._lock = threading.Lock()
+        # 제출했지만 아직 끝나지 않은 작업
+        self._pending = set()
+        # 대화 → 마지막으로 제출한 작업
+        self._latest = {}
+
+    def submit(self, worker: PooledWorker, key: Optional[Hashable] = None) -> bool:
+        """
+        작업 제출 (GUI 스레드에서 호출)
+
+        Args:
+            worker: 실행할 작업
+            key: 대화 구분 키 (같은 키의 이전 작업은 취소, None이면 취소하지 않음)
+
+        Returns:
+            대기열이 가득 차 거절했으면 False (이때 같은 키의 이전 작업은 취소하지 않음)
+        """
+        with self._lock:
+            previous = self._latest.get(key) if key is not None else None
+            # 같은 대화의 이전 작업은 이 작업으로 교체되므로 빈 자리로 계산
+            occupied = len(self._pending) - (previous in self._pending)
+            if occupied >= self.max_pending:
+                return False
+            self._pending.add(worker)
+            if key is not None:
+                self._latest[key] = worker
+
+        # 새 작업을 받은 뒤에만 이전 작업 취소
+        if previous is not None:
+            self._cancel(previous)
+
+        # 시그널 객체는 실행기가 소유하고, 작업이 끝나면 GUI 스레드에서 deleteLater()로 정리
+        worker.signals.setParent(self)
+        worker.signals.finished.connect(functools.partial(self._done, worker))
+        self.pool.start(worker)
+        return True
+
+    def cancel(self, key: Hashable):
+        """대화의 진행 중인 작업 취소"""
+        with self._lock:
+            worker = self._latest.pop(key, None)
+        if worker is not None:
+            self._cancel(worker)
+
+    def _cancel(self, worker: PooledWorker):
+        worker.cancel()
+        # 아직 시작하지 않은 작업은 대기열에서 바로 제거
+        if self.pool.tryTake(worker):
+            self._done(worker)
+
+    def _done(self, worker: PooledWorker):
+        """작업 정리 (GUI 스레드에서 호출)"""
+        with self._lock:
+            if worker not in self._pending:
+                return
+            self._pending.discard(worker)
+            for key, latest in list(self._latest.items()):
+                if latest is worker:
+                    del self._latest[key]
+        worker.signals.deleteLater()
+
+    def pending_count(self) -> int:
+        """실행 중이거나 대기 중인 작업 수"""
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self, timeout_ms: int = 3000):
+        """모든 작업을 취소하고 실행 중인 작업이 끝나기를 기다림"""
+        self.pool.clear()
+        with self._lock:
+            workers, self._pending = list(self._pending), set()
+            self._latest = {}
+        for worker in workers:
+            worker.cancel()
+        self.pool.waitForDone(timeout_ms)
+
+
+_executor: Optional[ChatExecutor] = None
+
+
+def get_chat_executor() -> ChatExecutor:
+    """프로세스 공용 채팅 요청 실행기 반환 (창/탭이 여러 개여도 하나의 스레드 풀을 공유)"""
+    global _executor
+
+    if _executor is None:
+        _executor = ChatExecutor(
+            max_threads=int(os.environ.get("PUTER_CHAT_THREADS", 4)),
+            max_queued=int(os.environ.get("PUTER_CHAT_QUEUE", 16))
+        )
+    return _executor
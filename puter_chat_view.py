@@ -0,0 +1,130 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import QApplication, QListView, QAbstractItemView
+
+
+def format_message(msg) -> str:
+    """대화 메시지 하나의 표시 텍스트"""
+    if msg['role'] == 'user':
+        text = f"👤 사용자: {msg['content']}"
+        if msg.get('image'):
+            text += "\n   [이미지 첨부됨]"
+        return text
+    return f"🤖 AI: {msg['content']}"
+
+
+class ChatMessageModel(QAbstractListModel):
+    """대화 표시 줄 목록 (메시지와 오류 알림을 한 줄씩 보관)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._rows[index.row()]
+        return None
+
+    def append_row(self, text: str) -> int:
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append(text)
+        self.endInsertRows()
+        return row
+
+    def set_row(self, row: int, text: str):
+        self._rows[row] = text
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self.endResetModel()
+
+
+class ChatView(QListView):
+    """
+    대화 내용 표시 영역 (QTextEdit 대체)
+
+    새 메시지만 줄로 추가하고 응답이 스트리밍되는 동안에는 마지막 줄만 고치므로,
+    갱신 비용이 대화 길이와 무관합니다. QListView는 화면에 보이는 줄만 그리고
+    배치 레이아웃으로 줄 높이를 나눠 계산하므로 긴 대화도 메모리와 다시 그리기 비용이 일정합니다.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.chat_model = ChatMessageModel(self)
+        self.setModel(self.chat_model)
+
+        self.setWordWrap(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(100)
+        self.setSpacing(4)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+
+        # messages 목록의 메시지 위치 → 표시 줄 번호
+        self._message_rows = []
+        self._message_texts = []
+
+    def _append(self, text: str) -> int:
+        # 맨 아래를 보고 있을 때만 새 줄을 따라 스크롤
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        row = self.chat_model.append_row(text)
+        if at_bottom:
+            self.scrollToBottom()
+        return row
+
+    def sync(self, messages):
+        """
+        messages 목록과 표시 내용 맞추기
+
+        이미 표시한 메시지는 다시 그리지 않고, 내용이 바뀐 마지막 메시지(스트리밍 중인 응답)만
+        갱신한 뒤 새로 추가된 메시지를 뒤에 붙입니다.
+
+        Args:
+            messages: {"role", "content", "image"} 메시지 목록
+        """
+        if len(messages) < len(self._message_rows):
+            # 목록이 줄었으면 (대화 초기화 등) 처음부터 다시 표시
+            self.clear()
+
+        if self._message_rows:
+            last = len(self._message_rows) - 1
+            text = format_message(messages[last])
+            if text != self._message_texts[last]:
+                self._message_texts[last] = text
+                self.chat_model.set_row(self._message_rows[last], text)
+
+        for msg in messages[len(self._message_rows):]:
+            text = format_message(msg)
+            self._message_rows.append(self._append(text))
+            self._message_texts.append(text)
+
+    def append(self, text: str):
+        """메시지 목록에 속하지 않는 알림 줄 추가 (오류 등)"""
+        self._append(text)
+
+    def clear(self):
+        self.chat_model.clear()
+        self._message_rows = []
+        self._message_texts = []
+
+    def keyPressEvent(self, event):
+        # 선택한 줄을 텍스트로 복사
+        if event.matches(QKeySequence.Copy):
+            rows = sorted(index.row() for index in self.selectedIndexes())
+            QApplication.clipboard().setText(
+                "\n\n".join(self.chat_model.data(self.chat_model.index(row)) for row in rows)
+            )
+            return
+        super().keyPressEvent(event)
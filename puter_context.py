@@ -0,0 +1,198 @@
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple, Callable
+
+# 모델 계열 → (ASCII 문자당 토큰 수, 그 외 문자(한글 등)당 토큰 수)
+# 실제 토크나이저 대신 쓰는 근사값으로, 약간 많게 잡아 한도를 넘지 않도록 함
+TOKEN_RATES = {
+    "claude": (1 / 3.5, 1.0),
+    "gpt-4": (1 / 4.0, 1.0),
+    "gpt-3.5": (1 / 4.0, 1.0),
+    "default": (1 / 3.5, 1.0),
+}
+
+# 모델 계열 → 컨텍스트 한도 (토큰)
+CONTEXT_LIMITS = {
+    "claude": 200000,
+    "gpt-4": 8192,
+    "gpt-3.5": 16385,
+    "default": 8192,
+}
+
+# 메시지마다 붙는 역할/구분자 토큰
+MESSAGE_OVERHEAD = 4
+
+# (ASCII 문자 수, 그 외 문자 수) - 모델과 무관하게 턴마다 한 번만 계산
+TextUnits = Tuple[int, int]
+
+
+def text_units(text: str) -> TextUnits:
+    """토큰 수 추정에 쓰는 문자 수 집계"""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return ascii_chars, len(text) - ascii_chars
+
+
+def model_family(model: str) -> str:
+    """모델 이름에서 토큰 근사/한도 계열 찾기"""
+    for family in TOKEN_RATES:
+        if model and model.startswith(family):
+            return family
+    return "default"
+
+
+def estimate_tokens(units: TextUnits, model: str) -> int:
+    """문자 수로 메시지 하나의 토큰 수 추정"""
+    ascii_rate, wide_rate = TOKEN_RATES[model_family(model)]
+    return math.ceil(units[0] * ascii_rate + units[1] * wide_rate) + MESSAGE_OVERHEAD
+
+
+def extractive_summary(turns: List[Tuple[str, str, TextUnits]], max_tokens: int = 512) -> str:
+    """
+    오래된 턴을 각 턴의 앞부분으로 요약
+
+    Args:
+        turns: 요약할 (역할, 내용, 문자 수) 턴 목록 (오래된 순)
+        max_tokens: 요약 최대 토큰 수 (한 글자를 한 토큰으로 보수적으로 계산)
+
+    Returns:
+        요약 텍스트
+    """
+    names = {"user": "사용자", "assistant": "AI"}
+    header = "이전 대화 요약:"
+    lines = []
+    # 최근 턴을 우선해 남기고, 넘치면 더 오래된 턴을 버림
+    remaining = max_tokens - MESSAGE_OVERHEAD - len(header)
+    for role, content, _ in reversed(turns):
+        line = f"- {names.get(role, role)}: {' '.join(content.split())[:120]}"
+        if len(line) + 1 > remaining:
+            break
+        lines.append(line)
+        remaining -= len(line) + 1
+
+    return "\n".join([header] + lines[::-1])
+
+
+class ContextManager:
+    """
+    대화 기록을 모델의 토큰 예산 안으로 맞추는 컨텍스트 관리자
+
+    턴마다 저장해 둔 문자 수로 토큰을 추정하므로 새 턴만 한 번 세면 되고,
+    예산을 넘는 오래된 턴은 버리거나 캐시된 요약 하나로 대체합니다.
+    """
+
+    def __init__(self, budget: int = 8000, reserve: int = 1024, summarize: bool = True,
+                 summary_tokens: int = 512,
+                 summarizer: Callable[[List[Tuple[str, str, TextUnits]], int], str] = extractive_summary,
+                 max_summaries: int = 1024):
+        """
+        Args:
+            budget: 대화 기록에 쓸 최대 토큰 수 (모델 한도 - reserve를 넘지 않음)
+            reserve: 응답 생성을 위해 남겨 둘 토큰 수
+            summarize: 잘린 턴을 요약으로 대체할지 여부
+            summary_tokens: 요약에 할당할 최대 토큰 수 (예산에 포함)
+            summarizer: (잘린 턴 목록, 최대 토큰 수)로 요약 텍스트를 만드는 함수
+            max_summaries: 캐시할 요약 수
+        """
+        self.budget = budget
+        self.reserve = reserve
+        self.summarize = summarize
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.max_summaries = max_summaries
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def budget_for(self, model: str) -> int:
+        """모델에 적용할 토큰 예산"""
+        return max(0, min(self.budget, CONTEXT_LIMITS[model_family(model)] - self.reserve))
+
+    def _summary(self, conversation_id: str, dropped: List[Tuple[str, str, TextUnits]],
+                 max_tokens: int) -> Tuple[str, TextUnits]:
+        # 같은 지점까지 잘린 대화는 요약을 다시 만들지 않음
+        key = (conversation_id, len(dropped), dropped[-1][1], max_tokens)
+        with self._lock:
+            cached = self._summaries.get(key)
+            if cached is not None:
+                self._summaries.move_to_end(key)
+                return cached
+
+        summary = self.summarizer(dropped, max_tokens)
+        cached = (summary, text_units(summary))
+
+        with self._lock:
+            self._summaries[key] = cached
+            while len(self._summaries) > self.max_summaries:
+                self._summaries.popitem(last=False)
+        return cached
+
+    @staticmethod
+    def _window(turns: List[Tuple[str, str, TextUnits]], model: str, budget: int) -> Tuple[int, int]:
+        """최신 턴부터 예산이 허락하는 만큼 유지 (유지 시작 위치, 사용 토큰 수)"""
+        used = 0
+        start = len(turns)
+        while start > 0:
+            tokens = estimate_tokens(turns[start - 1][2], model)
+            if used + tokens > budget:
+                break
+            used += tokens
+            start -= 1
+        return start, used
+
+    def build(self, conversation_id: str, turns: List[Tuple[str, str, TextUnits]], model: str,
+              system_prompt: Optional[str] = None, message: str = "") -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+        """
+        예산 안에 들어가는 대화 기록 구성
+
+        Args:
+            conversation_id: 대화 ID (요약 캐시 키)
+            turns: (역할, 내용, 문자 수) 턴 목록 (오래된 순)
+            model: AI 모델
+            system_prompt: 시스템 프롬프트 (예산에서 제외)
+            message: 새 사용자 메시지 (예산에서 제외)
+
+        Returns:
+            (백엔드에 전달할 대화 기록, 토큰/턴 통계)
+        """
+        budget = self.budget_for(model) - estimate_tokens(text_units(message), model)
+        if system_prompt:
+            budget -= estimate_tokens(text_units(system_prompt), model)
+        budget = max(0, budget)
+
+        start, used = self._window(turns, model, budget)
+        summary = None
+
+        # 예산이 작을 때도 최근 턴이 남도록 요약은 예산의 절반까지만 사용
+        allowance = min(self.summary_tokens, budget // 2)
+        if start and self.summarize and allowance > MESSAGE_OVERHEAD:
+            # 요약이 들어갈 자리를 남기고 다시 자름
+            start, used = self._window(turns, model, budget - allowance)
+            summary, units = self._summary(conversation_id, turns[:start], allowance)
+            summary_tokens = estimate_tokens(units, model)
+            if used + summary_tokens <= budget:
+                used += summary_tokens
+            else:
+                summary = None
+
+        history = [{"role": role, "content": content} for role, content, _ in turns[start:]]
+        if summary:
+            history.insert(0, {"role": "system", "content": summary})
+
+        return history, {
+            "tokens": used,
+            "budget": budget,
+            "turns": len(turns) - start,
+            "dropped": start,
+            "summarized": bool(summary)
+        }
+
+
+def get_context_manager() -> ContextManager:
+    """환경변수 설정으로 컨텍스트 관리자 생성"""
+    return ContextManager(
+        budget=int(os.environ.get("PUTER_CONTEXT_BUDGET", 8000)),
+        reserve=int(os.environ.get("PUTER_CONTEXT_RESERVE", 1024)),
+        summarize=os.environ.get("PUTER_CONTEXT_SUMMARY", "1") != "0",
+        summary_tokens=int(os.environ.get("PUTER_CONTEXT_SUMMARY_TOKENS", 512))
+    )
@@ -0,0 +1,292 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+
+from puter_context import TextUnits, text_units
+
+# (역할, 내용) 튜플로 대화 턴을 저장해 메모리 사용량을 줄임
+Turn = Tuple[str, str]
+# 저장된 턴 (역할, 내용, 문자 수) - 토큰 추정용 문자 수는 추가할 때 한 번만 계산
+StoredTurn = Tuple[str, str, TextUnits]
+
+
+class ConversationStore:
+    """
+    서버 측 대화 세션 저장소
+
+    SQLite 경로가 없으면 메모리에만 LRU로 보관합니다. 경로가 주어지면 SQLite가 원본이고
+    메모리 LRU는 캐시일 뿐이므로, 같은 파일을 쓰는 여러 워커 프로세스가 같은 대화를 공유합니다.
+    읽을 때마다 대화의 마지막 seq만 확인해 다른 프로세스가 턴을 추가했으면 캐시를 다시 불러옵니다.
+    SQLite에는 대화마다 최근 max_turns개 턴만 남기고, ttl 동안 턴이 추가되지 않은 대화는 삭제합니다.
+    """
+
+    def __init__(self, max_conversations: int = 10000, max_turns: int = 200,
+                 db_path: Optional[str] = None, ttl: float = 7 * 86400,
+                 evict_interval: float = 60):
+        """
+        Args:
+            max_conversations: 메모리에 유지할 최대 대화 수
+            max_turns: 대화 하나에 유지할 최대 턴 수 (초과 시 오래된 턴부터 제거)
+            db_path: SQLite 데이터베이스 파일 경로 (None이면 메모리에만 저장)
+            ttl: SQLite에서 마지막으로 턴이 추가된 뒤 대화를 보관할 시간 (초, 0이면 삭제하지 않음)
+            evict_interval: 만료된 대화를 정리하는 최소 간격 (초)
+        """
+        self.max_conversations = max_conversations
+        self.max_turns = max_turns
+        self.db_path = db_path
+        self.ttl = ttl
+        self.evict_interval = evict_interval
+        # 대화 ID → (마지막 seq, 턴 목록) - 메모리 전용이면 seq는 사용하지 않음
+        self._conversations = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # 스키마를 준비한 프로세스 ID와 마지막 정리 시각
+        self._schema_pid = None
+        self._evicted_at = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 커넥션은 스레드 간 공유하지 않고 스레드마다 하나씩 사용하며,
+        # preload로 마스터 프로세스에서 앱을 만들어도 fork된 워커에서 처음 사용할 때 엽니다
+        pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != pid:
+            # 트랜잭션은 직접 관리 (BEGIN IMMEDIATE로 seq 할당을 직렬화)
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = pid
+
+        if self._schema_pid != pid:
+            self._create_schema(conn)
+            self._schema_pid = pid
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                "id TEXT PRIMARY KEY, created_at REAL NOT NULL, updated_at REAL)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(conversations)")]
+            if "updated_at" not in columns:
+                # updated_at이 없던 이전 버전 파일
+                conn.execute("ALTER TABLE conversations ADD COLUMN updated_at REAL")
+            conn.execute("UPDATE conversations SET updated_at = created_at WHERE updated_at IS NULL")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS conversations_updated_at ON conversations (updated_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS turns ("
+                "conversation_id TEXT NOT NULL, seq INTEGER NOT NULL, "
+                "role TEXT NOT NULL, content TEXT NOT NULL, "
+                "PRIMARY KEY (conversation_id, seq))"
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict_expired(self, conn: sqlite3.Connection):
+        """ttl 동안 턴이 추가되지 않은 대화 삭제 (evict_interval마다 한 번)"""
+        now = time.monotonic()
+        if not self.ttl or now - self._evicted_at < self.evict_interval:
+            return
+        self._evicted_at = now
+
+        cutoff = time.time() - self.ttl
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM turns WHERE conversation_id IN "
+                "(SELECT id FROM conversations WHERE updated_at < ?)",
+                (cutoff,)
+            )
+            conn.execute("DELETE FROM conversations WHERE updated_at < ?", (cutoff,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _remember(self, conversation_id: str, turns: List[StoredTurn], last_seq: int = -1):
+        """메모리 LRU에 대화 추가 (잠금을 잡은 상태에서 호출)"""
+        self._conversations[conversation_id] = (last_seq, turns)
+        self._conversations.move_to_end(conversation_id)
+        while len(self._conversations) > self.max_conversations:
+            self._conversations.popitem(last=False)
+
+    def _load(self, conversation_id: str) -> Optional[List[StoredTurn]]:
+        """대화 턴 목록 (잠금을 잡은 상태에서 호출, SQLite가 있으면 캐시가 최신인지 확인)"""
+        cached = self._conversations.get(conversation_id)
+
+        if not self.db_path:
+            if cached is None:
+                return None
+            self._conversations.move_to_end(conversation_id)
+            return cached[1]
+
+        conn = self._connect()
+        found, last_seq = conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM conversations WHERE id = ?), "
+            "(SELECT MAX(seq) FROM turns WHERE conversation_id = ?)",
+            (conversation_id, conversation_id)
+        ).fetchone()
+        if not found and last_seq is None:
+            # 다른 프로세스에서 삭제된 대화
+            self._conversations.pop(conversation_id, None)
+            return None
+
+        last_seq = -1 if last_seq is None else last_seq
+        if cached is not None and cached[0] == last_seq:
+            self._conversations.move_to_end(conversation_id)
+            return cached[1]
+
+        rows = conn.execute(
+            "SELECT role, content FROM turns WHERE conversation_id = ? ORDER BY seq DESC LIMIT ?",
+            (conversation_id, self.max_turns)
+        ).fetchall()
+        turns = [(role, content, text_units(content)) for role, content in reversed(rows)]
+        self._remember(conversation_id, turns, last_seq)
+        return turns
+
+    def create(self) -> str:
+        """새 대화를 만들고 ID 반환"""
+        conversation_id = uuid.uuid4().hex
+        if self.db_path:
+            now = time.time()
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO conversations (id, created_at, updated_at) VALUES (?, ?, ?)",
+                (conversation_id, now, now)
+            )
+            self._evict_expired(conn)
+        with self._lock:
+            self._remember(conversation_id, [])
+        return conversation_id
+
+    def exists(self, conversation_id: str) -> bool:
+        with self._lock:
+            return self._load(conversation_id) is not None
+
+    def turns(self, conversation_id: str) -> Optional[List[StoredTurn]]:
+        """
+        저장된 턴 목록 반환 (컨텍스트 구성용)
+
+        Returns:
+            (역할, 내용, 문자 수) 목록의 복사본 (없는 대화면 None)
+        """
+        with self._lock:
+            turns = self._load(conversation_id)
+            return None if turns is None else list(turns)
+
+    def history(self, conversation_id: str) -> Optional[List[Dict[str, str]]]:
+        """
+        대화 기록 반환
+
+        Returns:
+            [{"role": ..., "content": ...}, ...] (없는 대화면 None)
+        """
+        turns = self.turns(conversation_id)
+        if turns is None:
+            return None
+        return [{"role": role, "content": content} for role, content, _ in turns]
+
+    def _extend(self, conversation_id: str, stored: List[StoredTurn], first_seq: int = 0):
+        """메모리 캐시에 턴 추가 (잠금을 잡은 상태에서 호출)"""
+        last_seq = first_seq + len(stored) - 1
+        cached = self._conversations.get(conversation_id)
+        if self.db_path and (cached is None or cached[0] != first_seq - 1):
+            # 캐시가 최신이 아니면 (다른 프로세스가 추가함) 다음 읽기에서 다시 불러옴
+            self._conversations.pop(conversation_id, None)
+            return
+
+        turns = cached[1] if cached is not None else []
+        turns.extend(stored)
+        if len(turns) > self.max_turns:
+            del turns[:len(turns) - self.max_turns]
+        self._remember(conversation_id, turns, last_seq)
+
+    def append(self, conversation_id: str, *turns: Turn):
+        """대화에 턴 추가 (없는 대화면 새로 만듦)"""
+        stored = [(role, content, text_units(content)) for role, content in turns]
+
+        if not self.db_path:
+            with self._lock:
+                self._extend(conversation_id, stored)
+            return
+
+        conn = self._connect()
+        now = time.time()
+        # 다음 seq 조회와 추가 사이에 다른 스레드/프로세스가 끼어들지 않도록 쓰기 잠금을 먼저 잡음
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO conversations (id, created_at, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET updated_at = excluded.updated_at",
+                (conversation_id, now, now)
+            )
+            first_seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM turns WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO turns (conversation_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                [(conversation_id, first_seq + i, role, content) for i, (role, content) in enumerate(turns)]
+            )
+            # 최근 max_turns개만 남김 (읽을 때도 그 이상은 사용하지 않음)
+            conn.execute(
+                "DELETE FROM turns WHERE conversation_id = ? AND seq < ?",
+                (conversation_id, first_seq + len(turns) - self.max_turns)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._extend(conversation_id, stored, first_seq)
+        self._evict_expired(conn)
+
+    def delete(self, conversation_id: str) -> bool:
+        """대화 삭제 (삭제했으면 True)"""
+        with self._lock:
+            found = self._conversations.pop(conversation_id, None) is not None
+
+        if self.db_path:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = conn.execute(
+                    "DELETE FROM conversations WHERE id = ?", (conversation_id,)
+                ).rowcount
+                deleted += conn.execute(
+                    "DELETE FROM turns WHERE conversation_id = ?", (conversation_id,)
+                ).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            found = found or deleted > 0
+        return found
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = {"conversations": len(self._conversations), "persistent": bool(self.db_path)}
+        if self.db_path:
+            stats["ttl"] = self.ttl
+        return stats
+
+
+def get_conversation_store() -> ConversationStore:
+    """환경변수 설정으로 대화 저장소 생성"""
+    return ConversationStore(
+        max_conversations=int(os.environ.get("PUTER_CONVERSATIONS_MAX", 10000)),
+        max_turns=int(os.environ.get("PUTER_CONVERSATION_MAX_TURNS", 200)),
+        db_path=os.environ.get("PUTER_CONVERSATIONS_DB"),
+        ttl=float(os.environ.get("PUTER_CONVERSATIONS_TTL", 7 * 86400))
+    )
@@ -1,10 +1,4 @@
-from flask import Flask, request, jsonify, render_template_string
-import requests
-import json
-import os
-from datetime import datetime
-
-app = Flask(__name__)
+from puter_app import create_app
 
 # HTML 템플릿
 HTML_TEMPLATE = """
@@ -172,7 +166,9 @@ print(result["response"])
                 
                 <h4>🔗 API 정보</h4>
                 <ul>
-                    <li><strong>POST /chat</strong> - AI 채팅</li>
+                    <li><strong>POST /chat</strong> - AI 채팅 (<code>"stream": true</code> 시 SSE 응답)</li>
+                    <li><strong>POST /chat/stream</strong> - AI 채팅 스트리밍 (Server-Sent Events)</li>
+                    <li><strong>POST /chat/batch</strong> - AI 채팅 일괄 처리</li>
                     <li><strong>GET /health</strong> - 서버 상태 확인</li>
                     <li><strong>GET /models</strong> - 사용 가능한 모델 목록</li>
                 </ul>
@@ -193,10 +189,12 @@ print(result["response"])
             output.textContent = '응답을 기다리는 중...';
             
             try {
-                const response = await fetch('/chat', {
+                // 스트리밍 엔드포인트에서 토큰을 받는 대로 표시
+                const response = await fetch('/chat/stream', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
+                        'Accept': 'text/event-stream'
                     },
                     body: JSON.stringify({
                         message: message,
@@ -205,13 +203,49 @@ print(result["response"])
                     })
                 });
                 
-                const result = await response.json();
-                
-                if (result.success) {
-                    output.textContent = result.response;
-                    messageInput.value = '';
-                } else {
+                if (!response.ok || !response.body) {
+                    const result = await response.json();
                     output.textContent = `오류: ${result.error}`;
+                    return;
+                }
+                
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                let started = false;
+                
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    
+                    buffer += decoder.decode(value, { stream: true });
+                    const events = buffer.split('\n\n');
+                    buffer = events.pop();
+                    
+                    for (const raw of events) {
+                        let eventName = 'message';
+                        let payload = '';
+                        for (const line of raw.split('\n')) {
+                            if (line.startsWith('event:')) eventName = line.slice(6).trim();
+                            else if (line.startsWith('data:')) payload += line.slice(5).trim();
+                        }
+                        if (!payload) continue;
+                        
+                        const data = JSON.parse(payload);
+                        if (eventName === 'error') {
+                            output.textContent = `오류: ${data.error}`;
+                            return;
+                        }
+                        if (eventName === 'done') {
+                            messageInput.value = '';
+                            continue;
+                        }
+                        if (!started) {
+                            output.textContent = '';
+                            started = true;
+                        }
+                        output.textContent += data.token;
+                    }
                 }
             } catch (error) {
                 output.textContent = `네트워크 오류: ${error.message}`;
@@ -230,112 +264,20 @@ print(result["response"])
 </html>
 """
 
-class PuterAIServer:
-    """Puter AI 서버 클래스"""
-    
-    def __init__(self):
-        self.base_url = "https://api.puter.com"  # 실제 API 엔드포인트
-    
-    def chat(self, message: str, model: str = "claude-sonnet-4", 
-             system_prompt: str = None) -> dict:
-        """
-        AI 채팅 요청
-        
-        Args:
-            message: 사용자 메시지
-            model: AI 모델
-            system_prompt: 시스템 프롬프트
-            
-        Returns:
-            응답 결과
-        """
-        try:
-            # 실제 Puter API 호출 (예시)
-            # 실제 구현에서는 Puter의 공식 API를 사용해야 합니다
-            payload = {
-                "message": message,
-                "model": model
-            }
-            
-            if system_prompt:
-                payload["system_prompt"] = system_prompt
-            
-            # 여기서는 시뮬레이션 응답을 반환
-            # 실제로는 requests.post()를 사용하여 API 호출
-            return {
-                "success": True,
-                "response": f"시뮬레이션 응답: {message}에 대한 AI 답변입니다.",
-                "model": model,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
-
-# 서버 인스턴스 생성
-puter_server = PuterAIServer()
-
-@app.route('/')
-def index():
-    """메인 페이지"""
-    return render_template_string(HTML_TEMPLATE)
-
-@app.route('/chat', methods=['POST'])
-def chat():
-    """AI 채팅 API 엔드포인트"""
-    try:
-        data = request.get_json()
-        
-        if not data or 'message' not in data:
-            return jsonify({
-                "success": False,
-                "error": "메시지가 필요합니다."
-            }), 400
-        
-        message = data['message']
-        model = data.get('model', 'claude-sonnet-4')
-        system_prompt = data.get('system_prompt')
-        
-        # AI 응답 요청
-        result = puter_server.chat(message, model, system_prompt)
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
-
-@app.route('/health')
-def health():
-    """서버 상태 확인"""
-    return jsonify({
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "service": "Puter AI Flask Server"
-    })
+app = create_app({
+    "backend": "simulation",
+    "service": "Puter AI Flask Server",
+    "html_template": HTML_TEMPLATE
+})
 
-@app.route('/models')
-def models():
-    """사용 가능한 모델 목록"""
-    return jsonify({
-        "models": [
-            "claude-sonnet-4",
-            "claude-3-5-sonnet", 
-            "claude-3-opus",
-            "gpt-4",
-            "gpt-3.5-turbo"
-        ]
-    })
+# 서버 인스턴스 (app.extensions["puter"]와 동일)
+puter_server = app.extensions["puter"]
 
 if __name__ == '__main__':
     print("🚀 Puter AI Flask 서버를 시작합니다...")
     print("📱 웹 인터페이스: http://localhost:5000")
     print("📡 API 엔드포인트: http://localhost:5000/chat")
+    print("📶 스트리밍 엔드포인트: http://localhost:5000/chat/stream")
     print("🔍 서버 상태: http://localhost:5000/health")
     print("📋 모델 목록: http://localhost:5000/models")
     print("\n종료하려면 Ctrl+C를 누르세요.\n")
@@ -0,0 +1,220 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+PUTER_API_URL = "https://api.puter.com"
+
+# 세션 확인(whoami + Socket.IO 폴링) 결과를 재사용할 시간 (초)
+HANDSHAKE_TTL = float(os.environ.get("PUTER_HANDSHAKE_TTL", 300))
+# 세션 만료로 보고 핸드셰이크를 다시 할 응답 코드
+SESSION_EXPIRED_STATUS_CODES = (401, 403, 419)
+
+
+class PuterSessionError(Exception):
+    """세션 확인(Socket.IO 폴링) 실패"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Socket.IO 연결 실패: {status_code}")
+        self.status_code = status_code
+
+
+class PuterHTTPClient:
+    """
+    프로세스 공용 Puter HTTP 클라이언트
+
+    하나의 requests.Session으로 keep-alive 커넥션을 재사용하므로 메시지마다 DNS/TCP/TLS 연결을 새로 맺지 않습니다.
+    세션 확인 요청은 결과를 캐시해 두고 만료되거나 요청이 실패했을 때만 다시 보냅니다.
+    """
+
+    def __init__(self, base_url: str = PUTER_API_URL, pool_size: int = 10,
+                 handshake_ttl: float = HANDSHAKE_TTL):
+        """
+        Args:
+            base_url: Puter API URL
+            pool_size: 유지할 커넥션 수 (동시에 실행되는 워커 수 이상)
+            handshake_ttl: 세션 확인 결과를 재사용할 시간 (초)
+        """
+        self.base_url = base_url
+        self.handshake_ttl = handshake_ttl
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._handshake_at = 0.0
+        self._handshake_status = None
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.session.post(url, **kwargs)
+
+    def handshake(self, force: bool = False) -> int:
+        """
+        세션 확인 (whoami + Socket.IO 폴링, 캐시된 결과가 유효하면 생략)
+
+        Args:
+            force: 캐시를 무시하고 다시 확인
+
+        Returns:
+            Socket.IO 폴링 응답 코드
+        """
+        # 여러 워커가 동시에 확인하지 않도록 잠금 안에서 처리
+        with self._lock:
+            if (not force and self._handshake_status == 200
+                    and time.monotonic() - self._handshake_at < self.handshake_ttl):
+                return self._handshake_status
+
+            whoami_response = self.session.get(f"{self.base_url}/whoami", timeout=10)
+            print(f"Whoami 응답: {whoami_response.status_code}")
+
+            polling_url = f"{self.base_url}/socket.io/?EIO=4&transport=polling&t={int(time.time() * 1000)}"
+            polling_response = self.session.get(polling_url, timeout=10)
+            print(f"Polling 응답: {polling_response.status_code}")
+
+            self._handshake_status = polling_response.status_code
+            self._handshake_at = time.monotonic()
+            return self._handshake_status
+
+    def invalidate(self):
+        """캐시된 세션 확인 결과 폐기 (다음 handshake()에서 다시 확인)"""
+        with self._lock:
+            self._handshake_status = None
+
+    def post_with_session(self, url: str, **kwargs) -> requests.Response:
+        """
+        세션 확인 후 POST (세션 만료 응답이면 한 번 다시 확인하고 재시도)
+
+        Raises:
+            PuterSessionError: 세션 확인 실패
+            requests.exceptions.RequestException: 네트워크 오류 (다음 요청에서 세션을 다시 확인)
+        """
+        try:
+            for attempt in range(2):
+                status = self.handshake(force=attempt > 0)
+                if status != 200:
+                    raise PuterSessionError(status)
+
+                response = self.post(url, **kwargs)
+                if response.status_code not in SESSION_EXPIRED_STATUS_CODES or attempt:
+                    return response
+                # stream=True 요청이면 커넥션을 풀에 돌려놓고 재시도
+                response.close()
+        except requests.exceptions.RequestException:
+            self.invalidate()
+            raise
+
+
+def iter_chat_chunks(response: requests.Response) -> Iterator[str]:
+    """
+    채팅 응답에서 텍스트 조각 읽기
+
+    스트리밍(text/event-stream) 응답이면 도착하는 delta를 하나씩 돌려주고,
+    서버가 스트리밍을 지원하지 않아 JSON 한 번으로 응답하면 전체 텍스트를 한 조각으로 돌려줍니다.
+
+    Raises:
+        ValueError: 응답 형식이 올바르지 않음
+    """
+    if "text/event-stream" not in response.headers.get("Content-Type", ""):
+        result = response.json()
+        if 'choices' in result and len(result['choices']) > 0:
+            yield result['choices'][0]['message']['content']
+            return
+        raise ValueError("응답 형식이 올바르지 않습니다.")
+
+    # SSE는 항상 UTF-8 (charset이 없으면 requests가 ISO-8859-1로 디코딩해 한글이 깨짐)
+    for raw_line in response.iter_lines():
+        line = raw_line.decode("utf-8")
+        if not line or not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if payload == "[DONE]":
+            return
+        event = json.loads(payload)
+        choices = event.get('choices') or [{}]
+        text = (choices[0].get('delta') or {}).get('content')
+        if text:
+            yield text
+
+
+class ChunkBuffer:
+    """
+    텍스트 조각을 모아 일정 간격으로만 내보내는 버퍼
+
+    토큰마다 시그널을 보내면 빠른 스트림이 이벤트 루프를 가득 채우므로,
+    작업 스레드에서 조각을 모았다가 interval마다 한 번만 UI로 보냅니다.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        """
+        Args:
+            interval: 최소 전달 간격 (초, 기본 50ms = 초당 최대 20번 갱신)
+        """
+        self.interval = interval
+        self._parts = []
+        self._sent_at = 0.0
+
+    def add(self, text: str) -> Optional[str]:
+        """조각 추가 (전달할 때가 되었으면 모인 텍스트 반환)"""
+        self._parts.append(text)
+        if time.monotonic() - self._sent_at >= self.interval:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """모인 텍스트 모두 반환 (없으면 None)"""
+        if not self._parts:
+            return None
+        text = "".join(self._parts)
+        self._parts = []
+        self._sent_at = time.monotonic()
+        return text
+
+
+def read_chat_stream(response: requests.Response, on_chunk: Callable[[str], None],
+                     interval: float = 0.05, cancelled: Optional[Callable[[], bool]] = None) -> str:
+    """
+    채팅 응답을 읽으면서 모인 조각을 interval마다 on_chunk로 전달
+
+    Args:
+        cancelled: True를 반환하면 읽기를 멈추는 함수 (취소된 요청의 스트림을 끝까지 받지 않음)
+
+    Returns:
+        전체 응답 텍스트 (취소되었으면 받은 부분까지)
+    """
+    buffer = ChunkBuffer(interval)
+    parts = []
+    for text in iter_chat_chunks(response):
+        if cancelled and cancelled():
+            break
+        parts.append(text)
+        pending = buffer.add(text)
+        if pending:
+            on_chunk(pending)
+
+    pending = buffer.flush()
+    if pending:
+        on_chunk(pending)
+    return "".join(parts)
+
+
+_client: Optional[PuterHTTPClient] = None
+_client_lock = threading.Lock()
+
+
+def get_puter_http() -> PuterHTTPClient:
+    """프로세스 공용 Puter HTTP 클라이언트 반환"""
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = PuterHTTPClient(pool_size=int(os.environ.get("PUTER_HTTP_POOL_SIZE", 10)))
+        return _client
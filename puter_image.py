@@ -0,0 +1,151 @@
+import base64
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+
+
+# 긴 변 최대 픽셀 수 (Claude 비전 입력 권장 크기, 더 크면 서버에서 어차피 축소됨)
+MAX_IMAGE_SIZE = int(os.environ.get("PUTER_IMAGE_MAX_SIZE", 1568))
+# JPEG/WebP 인코딩 품질
+IMAGE_QUALITY = int(os.environ.get("PUTER_IMAGE_QUALITY", 85))
+
+# (MIME 타입, base64 데이터)
+EncodedImage = Tuple[str, str]
+
+
+class ImageError(Exception):
+    """첨부 이미지를 읽거나 변환할 수 없음 (손상/잘린 파일, 이미지가 아닌 파일 등)"""
+
+
+def preprocess_image(data: bytes, max_size: int = MAX_IMAGE_SIZE, quality: int = IMAGE_QUALITY) -> Tuple[str, bytes]:
+    """
+    첨부 이미지를 전송용으로 변환
+
+    EXIF 회전을 적용한 뒤 긴 변이 max_size를 넘으면 축소하고, 불투명한 이미지는 JPEG,
+    투명도가 있는 이미지는 WebP로 다시 인코딩합니다. 원본의 EXIF/GPS 등 메타데이터는 옮기지 않습니다.
+    움직이는 GIF는 첫 프레임만 사용합니다.
+
+    Args:
+        data: 원본 파일 내용
+        max_size: 긴 변 최대 픽셀 수
+        quality: 인코딩 품질 (1-95)
+
+    Returns:
+        (MIME 타입, 인코딩된 이미지)
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        if max(img.size) > max_size:
+            img.thumbnail((max_size, max_size), Image.LANCZOS)
+
+        # RGBA/LA/PA 등 알파 채널이 있거나 팔레트/그레이스케일에 투명색이 지정된 경우
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        output = io.BytesIO()
+        if has_alpha:
+            img.convert("RGBA").save(output, "WEBP", quality=quality, method=4)
+            return "image/webp", output.getvalue()
+
+        img.convert("RGB").save(output, "JPEG", quality=quality, optimize=True, progressive=True)
+        return "image/jpeg", output.getvalue()
+
+
+class ImageCache:
+    """
+    변환한 이미지 캐시
+
+    같은 파일(경로, 수정 시각, 크기)이면 파일을 읽지도 않고, 경로가 달라도 내용 해시가 같으면
+    다시 변환하지 않으므로 같은 이미지를 다시 보내는 비용이 없습니다.
+    """
+
+    def __init__(self, max_entries: int = 32, max_size: int = MAX_IMAGE_SIZE, quality: int = IMAGE_QUALITY):
+        """
+        Args:
+            max_entries: 캐시할 최대 이미지 수
+            max_size: 긴 변 최대 픽셀 수
+            quality: 인코딩 품질
+        """
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.quality = quality
+        # (경로, 수정 시각, 크기) → 내용 해시
+        self._files = OrderedDict()
+        # 내용 해시 → (MIME 타입, base64 데이터)
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, digest: str) -> Optional[EncodedImage]:
+        encoded = self._images.get(digest)
+        if encoded is not None:
+            self._images.move_to_end(digest)
+        return encoded
+
+    def _remember(self, file_key, digest: str, encoded: Optional[EncodedImage] = None):
+        """잠금을 잡은 상태에서 호출"""
+        self._files[file_key] = digest
+        self._files.move_to_end(file_key)
+        while len(self._files) > self.max_entries:
+            self._files.popitem(last=False)
+
+        if encoded is not None:
+            self._images[digest] = encoded
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+
+    def encode(self, path: str) -> EncodedImage:
+        """
+        이미지 파일을 변환해 base64로 인코딩 (캐시된 결과가 있으면 재사용)
+
+        Returns:
+            (MIME 타입, base64 데이터)
+        """
+        stat = os.stat(path)
+        file_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            digest = self._files.get(file_key)
+            if digest is not None:
+                encoded = self._get(digest)
+                if encoded is not None:
+                    self._files.move_to_end(file_key)
+                    return encoded
+
+        with open(path, 'rb') as img_file:
+            data = img_file.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            encoded = self._get(digest)
+            if encoded is not None:
+                self._remember(file_key, digest)
+                return encoded
+
+        # 변환은 잠금 밖에서 (다른 작업 스레드를 막지 않음)
+        mime, image_bytes = preprocess_image(data, self.max_size, self.quality)
+        encoded = (mime, base64.b64encode(image_bytes).decode('utf-8'))
+
+        with self._lock:
+            self._remember(file_key, digest, encoded)
+        return encoded
+
+
+_cache = ImageCache()
+
+
+def image_data_url(path: str) -> str:
+    """
+    첨부 이미지의 data URL (전송용으로 축소/재인코딩, 결과는 캐시됨)
+
+    Raises:
+        ImageError: 파일을 읽을 수 없거나 이미지로 열거나 변환할 수 없음
+    """
+    try:
+        mime, img_data = _cache.encode(path)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        # UnidentifiedImageError(이미지가 아닌 파일), 잘린 파일, 인코딩 실패 등은 모두 OSError
+        raise ImageError(f"이미지를 처리할 수 없습니다: {e}") from e
+    return f"data:{mime};base64,{img_data}"
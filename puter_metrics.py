@@ -0,0 +1,176 @@
+import bisect
+import threading
+import weakref
+from typing import Dict, Tuple, List
+
+# 지연 시간 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 페이로드 크기 히스토그램 구간 (바이트)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# 메트릭 이름 → (타입, 설명)
+METRIC_INFO = {
+    "puter_http_requests_total": ("counter", "처리한 HTTP 요청 수"),
+    "puter_http_requests_in_flight": ("gauge", "처리 중인 HTTP 요청 수"),
+    "puter_http_request_duration_seconds": ("histogram", "라우트별 요청 처리 시간"),
+    "puter_http_request_size_bytes": ("histogram", "요청 본문 크기"),
+    "puter_http_response_size_bytes": ("histogram", "응답 본문 크기 (스트리밍 응답 제외)"),
+    "puter_http_errors_total": ("counter", "처리 중 발생한 예외 수 (예외 클래스별)"),
+    "puter_chat_duration_seconds": ("histogram", "모델별 채팅 요청 처리 시간 (서버 오버헤드 포함)"),
+    "puter_upstream_duration_seconds": ("histogram", "모델별 백엔드(업스트림) 응답 생성 시간"),
+    "puter_upstream_errors_total": ("counter", "모델별 백엔드(업스트림) 오류 수 (예외 클래스별)"),
+    "puter_chat_coalesced_total": ("counter", "진행 중인 동일 요청과 합쳐져 업스트림 호출을 생략한 수"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _ShardHolder:
+    """스레드 로컬에 보관하는 샤드 (스레드가 끝나 해제되면 샤드를 합산 값으로 옮김)"""
+
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self):
+        self.shard = {}
+
+
+def merge_shard(totals: dict, shard: dict):
+    """샤드 값을 totals에 더함"""
+    for key, value in dict(shard).items():
+        if isinstance(value, list):
+            current = totals.get(key)
+            if current is None:
+                totals[key] = list(value)
+            else:
+                for i, v in enumerate(value):
+                    current[i] += v
+        else:
+            totals[key] = totals.get(key, 0) + value
+
+
+class MetricsRegistry:
+    """
+    스레드별로 나눠 기록하고 수집 시 합산하는 메트릭 저장소
+
+    각 스레드는 자기 전용 딕셔너리에만 쓰므로 기록 경로에 잠금이 없습니다.
+    /metrics 요청이 올 때만 모든 스레드의 값을 합쳐 Prometheus 텍스트 형식으로 출력합니다.
+    종료된 스레드의 샤드는 합산 값 하나로 옮기므로 요청마다 스레드를 만드는 서버에서도 샤드 수가 늘지 않습니다.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        # 종료된 스레드들의 값 합계
+        self._retired = {}
+        # 샤드 등록/정리와 수집 때만 사용
+        self._shards_lock = threading.Lock()
+        self._buckets = {}
+
+    def _shard(self) -> dict:
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = _ShardHolder()
+            self._local.holder = holder
+            with self._shards_lock:
+                self._shards.append(holder.shard)
+            # 스레드가 끝나 스레드 로컬 값이 해제되면 샤드 정리
+            weakref.finalize(holder, self._retire, holder.shard)
+        return holder.shard
+
+    def _retire(self, shard: dict):
+        with self._shards_lock:
+            merge_shard(self._retired, shard)
+            # 내용이 같은 다른 샤드를 지우지 않도록 동일 객체를 찾아 제거
+            self._shards[:] = [s for s in self._shards if s is not shard]
+
+    def inc(self, name: str, labels: Dict[str, str] = None, value: float = 1):
+        """카운터/게이지 증가 (게이지 감소는 음수 값 사용)"""
+        shard = self._shard()
+        key = (name, tuple(sorted((labels or {}).items())))
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name: str, labels: Dict[str, str], value: float,
+                buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """히스토그램에 값 기록"""
+        self._buckets.setdefault(name, buckets)
+        shard = self._shard()
+        key = (name, tuple(sorted(labels.items())))
+        data = shard.get(key)
+        if data is None:
+            # [구간별 개수..., +Inf 개수, 합계]
+            data = shard[key] = [0] * (len(buckets) + 1) + [0.0]
+        data[bisect.bisect_left(buckets, value)] += 1
+        data[-1] += value
+
+    def collect(self) -> Dict[Tuple[str, Labels], object]:
+        """모든 스레드의 값을 합산"""
+        totals = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+            merge_shard(totals, self._retired)
+
+        for shard in shards:
+            merge_shard(totals, shard)
+        return totals
+
+    def render(self, extra: List[Tuple[str, str, str, Dict[str, str], float]] = ()) -> str:
+        """
+        Prometheus 텍스트 형식으로 출력
+
+        Args:
+            extra: 수집 시점에 계산하는 추가 메트릭 (이름, 타입, 설명, 레이블, 값) 목록
+        """
+        by_name = {}
+        for (name, labels), value in self.collect().items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            metric_type, help_text = METRIC_INFO.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+            for labels, value in sorted(by_name[name]):
+                if isinstance(value, list):
+                    lines.extend(self._render_histogram(name, labels, value))
+                else:
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+        for name, metric_type, help_text, labels, value in extra:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name}{format_labels(tuple(sorted(labels.items())))} {format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _render_histogram(self, name: str, labels: Labels, data: list) -> List[str]:
+        buckets = self._buckets[name]
+        lines = []
+        cumulative = 0
+        for bound, count in zip(buckets + (float("inf"),), data[:-1]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else format_value(bound)
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {format_value(data[-1])}")
+        lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+# 프로세스 공용 메트릭 저장소
+METRICS = MetricsRegistry()
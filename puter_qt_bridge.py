@@ -0,0 +1,373 @@
+import json
+import os
+
+from PyQt5.QtCore import QObject, QTimer, QUrl, QFile, QIODevice, pyqtSignal, pyqtSlot
+from PyQt5.QtWebChannel import QWebChannel
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineScript
+
+# 임시 페이지를 제공하는 로컬 서버 (python -m http.server 8000)
+LOCAL_SERVER_URL = "http://localhost:8000/"
+
+PAGE_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+</head>
+<body>
+    <div id="result"></div>
+    {body}
+    <script src="https://js.puter.com/v2/"></script>
+    <script>
+        new QWebChannel(qt.webChannelTransport, (channel) => {{
+            const bridge = channel.objects.bridge;
+            (async () => {{
+                try {{
+                    const response = await puter.ai.chat({prompt}, {{
+                        model: {model}
+                    }});
+
+                    const result = response.message.content[0].text;
+                    document.getElementById('result').innerHTML = result;
+                    bridge.resolve({request_id}, result);
+
+                }} catch (error) {{
+                    console.error('오류:', error);
+                    bridge.reject({request_id}, error && error.message ? error.message : String(error));
+                }}
+            }})();
+        }});
+    </script>
+</body>
+</html>
+"""
+
+# SDK를 한 번만 불러 두고 요청마다 puterRun만 호출하는 페이지
+WARM_PAGE_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Puter AI</title>
+</head>
+<body>
+    <script src="https://js.puter.com/v2/"></script>
+    <script>
+        new QWebChannel(qt.webChannelTransport, (channel) => {
+            const bridge = channel.objects.bridge;
+
+            window.puterRun = async (requestId, prompt, options) => {
+                try {
+                    const response = await puter.ai.chat(prompt, options);
+                    bridge.resolve(requestId, response.message.content[0].text);
+                } catch (error) {
+                    console.error('오류:', error);
+                    bridge.reject(requestId, error && error.message ? error.message : String(error));
+                }
+            };
+
+            bridge.ready();
+        });
+    </script>
+</body>
+</html>
+"""
+
+
+def webchannel_script() -> QWebEngineScript:
+    """페이지 생성 시 qwebchannel.js를 주입하는 스크립트 (http 페이지에서도 QWebChannel 사용)"""
+    qfile = QFile(":/qtwebchannel/qwebchannel.js")
+    qfile.open(QIODevice.ReadOnly)
+    source = bytes(qfile.readAll()).decode("utf-8")
+    qfile.close()
+
+    script = QWebEngineScript()
+    script.setName("qwebchannel")
+    script.setSourceCode(source)
+    script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+    script.setWorldId(QWebEngineScript.MainWorld)
+    script.setRunsOnSubFrames(False)
+    return script
+
+
+class ConsoleWebPage(QWebEnginePage):
+    """JS 콘솔 메시지를 출력하는 페이지"""
+
+    def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
+        print(f"JS Console: {message}")
+
+
+class PuterBridge(QObject):
+    """페이지의 JS가 호출하는 완료 알림 객체 (QWebChannel에 "bridge"로 등록)"""
+
+    resolved = pyqtSignal(int, str)
+    rejected = pyqtSignal(int, str)
+    page_ready = pyqtSignal()
+
+    @pyqtSlot()
+    def ready(self):
+        self.page_ready.emit()
+
+    @pyqtSlot(int, str)
+    def resolve(self, request_id, text):
+        self.resolved.emit(request_id, text)
+
+    @pyqtSlot(int, str)
+    def reject(self, request_id, message):
+        self.rejected.emit(request_id, message)
+
+
+class PuterWebRunner(QObject):
+    """
+    GUI 스레드에서 하나의 웹뷰로 puter.ai.chat 요청을 실행하는 실행기
+
+    결과는 JS 프로미스가 끝나는 즉시 QWebChannel을 통해 result/error 시그널로 전달되고,
+    제한 시간은 QTimer로 처리하므로 결과를 기다리며 스레드를 점유하지 않습니다.
+    """
+
+    result = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, parent=None, page_file: str = "temp_chat.html", base_url: str = LOCAL_SERVER_URL):
+        """
+        Args:
+            parent: 부모 QObject (GUI 스레드에서 생성해야 함)
+            page_file: 로컬 서버로 제공할 임시 HTML 파일 이름
+            base_url: 로컬 서버 URL
+        """
+        super().__init__(parent)
+        self.page_file = page_file
+        self.base_url = base_url
+
+        # 웹뷰는 요청마다 만들지 않고 한 번 만들어 재사용
+        self.view = QWebEngineView()
+        self.page = ConsoleWebPage(self.view)
+        self.view.setPage(self.page)
+        self.page.scripts().insert(webchannel_script())
+
+        self.bridge = PuterBridge(self)
+        self.channel = QWebChannel(self.page)
+        self.channel.registerObject("bridge", self.bridge)
+        self.page.setWebChannel(self.channel)
+
+        self.bridge.resolved.connect(self._on_resolved)
+        self.bridge.rejected.connect(self._on_rejected)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+        self._request_id = 0
+        self._active = False
+
+    def is_running(self) -> bool:
+        return self._active
+
+    def run(self, prompt: str, model: str = "claude-sonnet-4", body_html: str = "",
+            timeout_ms: int = 30000) -> int:
+        """
+        요청 시작 (진행 중인 요청은 취소)
+
+        Args:
+            prompt: puter.ai.chat에 전달할 프롬프트
+            model: AI 모델
+            body_html: 페이지 본문에 추가할 HTML
+            timeout_ms: 제한 시간 (밀리초)
+
+        Returns:
+            요청 ID
+        """
+        self.cancel()
+        self._request_id += 1
+
+        html = PAGE_TEMPLATE.format(
+            title="Puter AI Chat",
+            body=body_html,
+            # JSON으로 인코딩해 따옴표/줄바꿈이 있는 프롬프트도 안전하게 전달
+            prompt=json.dumps(prompt, ensure_ascii=False),
+            model=json.dumps(model),
+            request_id=self._request_id
+        )
+        with open(self.page_file, "w", encoding="utf-8") as f:
+            f.write(html)
+
+        self._active = True
+        self._timer.start(timeout_ms)
+        self.view.load(QUrl(self.base_url + self.page_file))
+        return self._request_id
+
+    def cancel(self):
+        """진행 중인 요청 취소 (시그널을 보내지 않음)"""
+        if self._active:
+            self._finish()
+            # 실행 중인 스크립트 중단
+            self.view.setUrl(QUrl("about:blank"))
+
+    def _finish(self):
+        self._active = False
+        self._timer.stop()
+        if self.page_file and os.path.exists(self.page_file):
+            os.remove(self.page_file)
+
+    def _on_resolved(self, request_id: int, text: str):
+        # 취소/시간 초과된 이전 요청의 결과는 무시
+        if self._active and request_id == self._request_id:
+            self._finish()
+            self.result.emit(text)
+
+    def _on_rejected(self, request_id: int, message: str):
+        if self._active and request_id == self._request_id:
+            self._finish()
+            self.error.emit(f"오류: {message}")
+
+    def _on_timeout(self):
+        if self._active:
+            self.cancel()
+            self.error.emit("응답 시간 초과")
+
+
+class PuterWarmRunner(PuterWebRunner):
+    """
+    SDK를 불러 둔 페이지 하나를 계속 사용하는 실행기
+
+    페이지는 생성할 때 한 번만 불러오고 요청마다 runJavaScript로 프롬프트만 전달하므로,
+    요청 하나에 걸리는 시간은 모델 호출 시간뿐입니다. 임시 파일과 로컬 서버도 필요 없습니다.
+    run()은 한 번에 하나의 요청을, submit()은 요청 ID로 구분되는 여러 요청을 동시에 처리합니다.
+    """
+
+    # submit()으로 보낸 요청의 결과 (요청 ID, 텍스트/오류 메시지)
+    finished = pyqtSignal(int, str)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, parent=None, base_url: str = LOCAL_SERVER_URL):
+        """
+        Args:
+            parent: 부모 QObject (GUI 스레드에서 생성해야 함)
+            base_url: 페이지 출처 (기존 임시 페이지와 같은 출처라 Puter 로그인 정보가 유지됨)
+        """
+        super().__init__(parent, page_file=None, base_url=base_url)
+        self._ready = False
+        # 요청 ID → (프롬프트, 옵션, 제한 시간 타이머, 페이지에 보냈는지 여부)
+        self._requests = {}
+        # run()으로 시작한 요청 ID
+        self._current = None
+
+        self.bridge.page_ready.connect(self._on_ready)
+        self.page.renderProcessTerminated.connect(self._on_crashed)
+        self.load()
+
+    def load(self):
+        """페이지와 SDK 불러오기 (완료되면 bridge.ready() 호출)"""
+        self._ready = False
+        self.page.setHtml(WARM_PAGE_HTML, QUrl(self.base_url))
+
+    def is_running(self) -> bool:
+        return self._current is not None
+
+    def pending_count(self) -> int:
+        """결과를 기다리는 요청 수"""
+        return len(self._requests)
+
+    def submit(self, prompt: str, model: str = "claude-sonnet-4", timeout_ms: int = 30000) -> int:
+        """
+        요청 추가 (진행 중인 다른 요청과 동시에 처리, 결과는 finished/failed 시그널)
+
+        Args:
+            prompt: puter.ai.chat에 전달할 프롬프트
+            model: AI 모델
+            timeout_ms: 제한 시간 (밀리초, 페이지 준비 시간 포함)
+
+        Returns:
+            요청 ID
+        """
+        self._request_id += 1
+        request_id = self._request_id
+
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.timeout.connect(lambda: self._on_request_timeout(request_id))
+        timer.start(timeout_ms)
+
+        options = {"model": model}
+        self._requests[request_id] = [prompt, options, timer, False]
+        if self._ready:
+            self._call(request_id)
+        return request_id
+
+    def run(self, prompt: str, model: str = "claude-sonnet-4", timeout_ms: int = 30000) -> int:
+        """
+        요청 시작 (run()으로 시작한 이전 요청은 취소, 결과는 result/error 시그널)
+
+        Returns:
+            요청 ID
+        """
+        self.cancel()
+        self._current = self.submit(prompt, model, timeout_ms)
+        return self._current
+
+    def _call(self, request_id: int):
+        request = self._requests[request_id]
+        prompt, options = request[0], request[1]
+        request[3] = True
+        self.page.runJavaScript(
+            f"window.puterRun({request_id}, {json.dumps(prompt, ensure_ascii=False)}, {json.dumps(options)});"
+        )
+
+    def discard(self, request_id: int) -> bool:
+        """요청 제거 (페이지는 그대로 두고 결과만 무시)"""
+        request = self._requests.pop(request_id, None)
+        if request is None:
+            return False
+        request[2].stop()
+        request[2].deleteLater()
+        if request_id == self._current:
+            self._current = None
+        return True
+
+    def cancel(self):
+        """run()으로 시작한 요청 취소"""
+        if self._current is not None:
+            self.discard(self._current)
+
+    def _complete(self, request_id: int, text: str = None, error: str = None):
+        is_current = request_id == self._current
+        if not self.discard(request_id):
+            # 취소/시간 초과된 요청의 늦은 결과는 무시
+            return
+
+        if error is None:
+            self.finished.emit(request_id, text)
+            if is_current:
+                self.result.emit(text)
+        else:
+            self.failed.emit(request_id, error)
+            if is_current:
+                self.error.emit(error)
+
+    def _on_resolved(self, request_id: int, text: str):
+        self._complete(request_id, text=text)
+
+    def _on_rejected(self, request_id: int, message: str):
+        self._complete(request_id, error=f"오류: {message}")
+
+    def _on_ready(self):
+        self._ready = True
+        # 페이지가 준비되기 전에 들어온 요청 실행
+        for request_id, request in list(self._requests.items()):
+            if not request[3]:
+                self._call(request_id)
+
+    def _on_crashed(self, status, exit_code):
+        # 렌더러 프로세스가 죽으면 보낸 요청은 실패 처리하고 페이지를 다시 불러옴
+        self._ready = False
+        for request_id, request in list(self._requests.items()):
+            if request[3]:
+                self._complete(request_id, error="페이지 프로세스가 종료되었습니다.")
+        self.load()
+
+    def _on_request_timeout(self, request_id: int):
+        self._complete(request_id, error="응답 시간 초과")
+        # SDK를 끝내 불러오지 못한 페이지는 다시 불러옴
+        if not self._ready and not self._requests:
+            self.load()
@@ -1,11 +1,28 @@
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import time
 import json
 import os
+import queue
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Any
+
+# 페이지의 브리지로 여러 요청을 한 번에 보내고 모두 끝나면 결과 목록으로 응답
+BRIDGE_CALL_SCRIPT = """
+const requests = arguments[0];
+const options = arguments[1];
+const done = arguments[arguments.length - 1];
+Promise.all(requests.map(r => window.puterBridge.chat(r.id, r.message, options))).then(done);
+"""
+
+
+class PuterChatError(Exception):
+    """puter.ai.chat 호출 실패 (브라우저는 정상)"""
 
 class PuterSeleniumClient:
     """Selenium을 사용한 Puter AI 클라이언트"""
@@ -19,6 +36,10 @@ class PuterSeleniumClient:
         """
         self.driver = None
         self.headless = headless
+        self.page_path = None
+        # 브라우저 풀에서 재활용 여부를 판단할 때 사용
+        self.requests_served = 0
+        self.last_used = time.monotonic()
         self.setup_driver()
     
     def setup_driver(self):
@@ -120,6 +141,37 @@ class PuterSeleniumClient:
                 // 전역 함수로 노출
                 window.sendMessageToAI = sendMessage;
                 window.getLastResponse = () => lastResponse;
+
+                // Selenium에서 puter.ai.chat을 직접 호출하는 브리지 (요청 ID로 결과 구분)
+                window.puterBridge = {
+                    async chat(id, message, options) {
+                        try {
+                            const response = await puter.ai.chat(message, options);
+                            const content = response && response.message ? response.message.content : null;
+                            let text;
+                            if (Array.isArray(content)) {
+                                text = content.map(part => part.text || '').join('');
+                            } else if (typeof content === 'string') {
+                                text = content;
+                            } else {
+                                text = String(response);
+                            }
+                            return {
+                                id: id,
+                                success: true,
+                                text: text,
+                                model: (response && response.message && response.message.model) || options.model,
+                                usage: (response && response.usage) || null
+                            };
+                        } catch (error) {
+                            return {
+                                id: id,
+                                success: false,
+                                error: error && error.message ? error.message : String(error)
+                            };
+                        }
+                    }
+                };
             </script>
             
             <!-- 응답을 저장할 숨겨진 요소 -->
@@ -128,57 +180,113 @@ class PuterSeleniumClient:
         </html>
         """
         
-        # 임시 HTML 파일 생성
-        with open("temp_chat.html", "w", encoding="utf-8") as f:
+        # 임시 HTML 파일 생성 (여러 브라우저가 동시에 만들 수 있도록 인스턴스마다 별도 파일 사용)
+        fd, self.page_path = tempfile.mkstemp(prefix="puter_chat_", suffix=".html")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
             f.write(html_content)
         
         # 브라우저에서 페이지 로드
-        file_path = os.path.abspath("temp_chat.html")
-        self.driver.get(f"file://{file_path}")
+        self.driver.get(Path(self.page_path).as_uri())
         
-        # 페이지 로드 대기
+        # 페이지와 브리지 로드 대기
         WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.ID, "message-input"))
+            lambda driver: driver.execute_script(
+                "return typeof puter !== 'undefined' && typeof window.puterBridge !== 'undefined'"
+            )
         )
     
-    def send_message(self, message: str) -> str:
+    def send_message(self, message: str, timeout: float = 30) -> str:
         """
         메시지 전송 및 응답 받기
         
         Args:
             message: 전송할 메시지
+            timeout: 응답 대기 시간 (초)
             
         Returns:
             AI 응답
         """
         try:
-            # 메시지 입력
-            message_input = self.driver.find_element(By.ID, "message-input")
-            message_input.clear()
-            message_input.send_keys(message)
-            
-            # 전송 버튼 클릭
-            send_button = self.driver.find_element(By.XPATH, "//button[text()='전송']")
-            send_button.click()
-            
-            # 응답 대기 (최대 30초)
-            wait = WebDriverWait(self.driver, 30)
-            
-            # AI 메시지가 나타날 때까지 대기
-            ai_message = wait.until(
-                EC.presence_of_element_located((By.CLASS_NAME, "ai-message"))
-            )
+            return self.request(message, timeout)
+        except Exception as e:
+            return f"오류 발생: {str(e)}"
+    
+    def request(self, message: str, timeout: float = 30) -> str:
+        """
+        메시지 전송 및 응답 받기 (오류 시 예외 발생)
+        
+        Args:
+            message: 전송할 메시지
+            timeout: 응답 대기 시간 (초)
             
-            # 마지막 AI 메시지 가져오기
-            ai_messages = self.driver.find_elements(By.CLASS_NAME, "ai-message")
-            if ai_messages:
-                response = ai_messages[-1].text
-                return response
+        Returns:
+            AI 응답
+        
+        Raises:
+            PuterChatError: puter.ai.chat 호출 실패
+            TimeoutException: 응답 대기 시간 초과
+            WebDriverException: 브라우저 오류
+        """
+        result = self.chat(message, timeout=timeout)
+        if not result["success"]:
+            raise PuterChatError(result["error"])
+        return result["text"]
+    
+    def chat(self, message: str, model: str = "claude-sonnet-4", timeout: float = 30) -> Dict[str, Any]:
+        """
+        puter.ai.chat 직접 호출
+        
+        Args:
+            message: 전송할 메시지
+            model: AI 모델
+            timeout: 응답 대기 시간 (초)
             
-            return "응답을 받지 못했습니다."
+        Returns:
+            {"id", "success", "text", "model", "usage"} 또는 {"id", "success": False, "error"}
+        """
+        return self.chat_many([message], model, timeout)[0]
+    
+    def chat_many(self, messages: List[Any], model: str = "claude-sonnet-4",
+                  timeout: float = 30) -> List[Dict[str, Any]]:
+        """
+        한 페이지에서 여러 요청을 동시에 처리
+        
+        Args:
+            messages: 전송할 메시지 목록 (각 항목은 문자열 또는 {"role", "content"} 목록)
+            model: AI 모델
+            timeout: 모든 응답을 기다릴 시간 (초)
             
-        except Exception as e:
-            return f"오류 발생: {str(e)}"
+        Returns:
+            메시지 순서대로의 응답 목록 (chat()과 같은 형식)
+        """
+        # 입력창/버튼 조작 없이 브리지로 호출하고, 요청 ID로 응답을 짝지음
+        requests = [{"id": uuid.uuid4().hex, "message": message} for message in messages]
+        self.driver.set_script_timeout(timeout)
+        results = self.driver.execute_async_script(BRIDGE_CALL_SCRIPT, requests, {"model": model})
+        
+        by_id = {result["id"]: result for result in results or []}
+        return [
+            by_id.get(request["id"], {"id": request["id"], "success": False, "error": "응답을 받지 못했습니다."})
+            for request in requests
+        ]
+    
+    def is_alive(self) -> bool:
+        """브라우저와 채팅 페이지가 정상인지 확인"""
+        try:
+            return bool(self.driver.execute_script(
+                "return document.readyState === 'complete' && typeof puter !== 'undefined'"
+            ))
+        except Exception:
+            return False
+    
+    def memory_usage(self) -> int:
+        """채팅 페이지의 JS 힙 사용량 (바이트, 알 수 없으면 0)"""
+        try:
+            return int(self.driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : 0"
+            ) or 0)
+        except Exception:
+            return 0
     
     def close(self):
         """브라우저 종료"""
@@ -187,10 +295,239 @@ class PuterSeleniumClient:
         
         # 임시 파일 삭제
         try:
-            os.remove("temp_chat.html")
+            if self.page_path:
+                os.remove(self.page_path)
         except:
             pass
 
+
+class BrowserPoolError(Exception):
+    """브라우저 풀 오류"""
+
+
+class BrowserPoolBusy(BrowserPoolError):
+    """대기 중인 요청이 너무 많아 새 요청을 받을 수 없음"""
+
+
+class BrowserPoolTimeout(BrowserPoolError):
+    """브라우저를 기다리거나 응답을 받는 중 시간 초과"""
+
+
+class PuterBrowserPool:
+    """
+    미리 띄워 둔 헤드리스 브라우저 풀
+
+    브라우저 하나는 한 번에 요청 하나를 처리하고, 남는 요청은 대기열에서 기다립니다.
+    일정 횟수 이상 사용했거나 메모리가 커진 브라우저, 오류가 난 브라우저는 새 브라우저로 교체합니다.
+    """
+
+    def __init__(self, size: int = 2, headless: bool = True, max_requests: int = 200,
+                 max_memory_mb: int = 512, timeout: float = 60, max_waiting: int = 100,
+                 health_interval: float = 30):
+        """
+        Args:
+            size: 유지할 브라우저 수
+            headless: 헤드리스 모드 여부
+            max_requests: 브라우저 하나가 처리할 최대 요청 수 (넘으면 교체)
+            max_memory_mb: 페이지 JS 힙이 이 크기(MB)를 넘으면 교체 (0이면 확인 안 함)
+            timeout: 요청 하나의 기본 제한 시간 (브라우저 대기 포함, 초)
+            max_waiting: 브라우저를 기다릴 수 있는 최대 요청 수 (넘으면 BrowserPoolBusy)
+            health_interval: 이 시간(초) 이상 쉬었던 브라우저는 사용 전에 상태 확인
+        """
+        self.size = size
+        self.headless = headless
+        self.max_requests = max_requests
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.timeout = timeout
+        self.max_waiting = max_waiting
+        self.health_interval = health_interval
+
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {"served": 0, "errors": 0, "recycled": 0, "start_failures": 0}
+
+    def start(self, wait: bool = True):
+        """
+        브라우저 미리 띄우기
+
+        Args:
+            wait: 모든 브라우저가 준비될 때까지 기다릴지 여부
+        """
+        for thread in self._ensure_capacity():
+            if wait:
+                thread.join()
+
+    def _spawn(self):
+        """새 브라우저를 띄워 유휴 목록에 추가 (별도 스레드에서 실행)"""
+        try:
+            client = PuterSeleniumClient(headless=self.headless)
+            try:
+                client.create_chat_page()
+            except Exception:
+                # 페이지 준비에 실패해도 이미 띄운 Chrome 프로세스는 종료
+                try:
+                    client.close()
+                except Exception as close_error:
+                    print(f"브라우저 종료 오류: {close_error}")
+                raise
+        except Exception as e:
+            print(f"브라우저 시작 오류: {e}")
+            with self._lock:
+                self._live -= 1
+                self._stats["start_failures"] += 1
+            return
+
+        if self._closed:
+            self._retire(client)
+            return
+        self._idle.put(client)
+
+    def _ensure_capacity(self):
+        """모자란 브라우저 수만큼 새로 띄우기"""
+        with self._lock:
+            missing = 0 if self._closed else self.size - self._live
+            self._live += max(0, missing)
+
+        threads = []
+        for _ in range(missing):
+            thread = threading.Thread(target=self._spawn, daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _retire(self, client: PuterSeleniumClient, recycled: bool = False):
+        """브라우저를 풀에서 제거 (종료는 느릴 수 있어 백그라운드에서 처리)"""
+        with self._lock:
+            self._live -= 1
+            if recycled:
+                self._stats["recycled"] += 1
+        threading.Thread(target=client.close, daemon=True).start()
+
+    def _acquire(self, timeout: float) -> PuterSeleniumClient:
+        """유휴 브라우저 하나 가져오기 (없으면 대기)"""
+        with self._lock:
+            if self._closed:
+                raise BrowserPoolError("브라우저 풀이 종료되었습니다.")
+            if self._waiting >= self.max_waiting:
+                raise BrowserPoolBusy("대기 중인 요청이 너무 많습니다.")
+            self._waiting += 1
+
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                self._ensure_capacity()
+                try:
+                    client = self._idle.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise BrowserPoolTimeout("사용 가능한 브라우저를 기다리는 중 시간 초과")
+
+                # 오래 쉬었던 브라우저는 죽었을 수 있으므로 확인 후 사용
+                if time.monotonic() - client.last_used < self.health_interval or client.is_alive():
+                    return client
+                self._retire(client)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def _release(self, client: PuterSeleniumClient, healthy: bool):
+        """사용한 브라우저를 돌려놓거나 교체"""
+        client.requests_served += 1
+        client.last_used = time.monotonic()
+
+        if self._closed:
+            self._retire(client)
+        elif (not healthy or client.requests_served >= self.max_requests
+              or (self.max_memory and client.memory_usage() > self.max_memory)):
+            self._retire(client, recycled=True)
+            self._ensure_capacity()
+        else:
+            self._idle.put(client)
+
+    def _run(self, fn, timeout: float = None):
+        """
+        풀의 브라우저 하나로 fn(client, 남은 시간) 실행
+
+        Raises:
+            BrowserPoolBusy: 대기열이 가득 참
+            BrowserPoolTimeout: 브라우저 대기 또는 응답 시간 초과
+            BrowserPoolError: 브라우저 오류
+        """
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        client = self._acquire(timeout)
+
+        healthy = True
+        succeeded = False
+        try:
+            result = fn(client, max(1.0, deadline - time.monotonic()))
+            succeeded = True
+            return result
+        except TimeoutException as e:
+            # 응답을 기다리던 페이지는 상태를 알 수 없으므로 교체
+            healthy = False
+            raise BrowserPoolTimeout("AI 응답 대기 시간 초과") from e
+        except WebDriverException as e:
+            healthy = False
+            raise BrowserPoolError(f"브라우저 오류: {e}") from e
+        finally:
+            with self._lock:
+                self._stats["served" if succeeded else "errors"] += 1
+            self._release(client, healthy)
+
+    def send_message(self, message: str, timeout: float = None) -> str:
+        """
+        풀의 브라우저로 메시지 전송 및 응답 받기 (여러 스레드에서 동시에 호출 가능)
+
+        Args:
+            message: 전송할 메시지
+            timeout: 제한 시간 (초, 브라우저 대기 시간 포함)
+
+        Returns:
+            AI 응답
+
+        Raises:
+            PuterChatError: puter.ai.chat 호출 실패
+            BrowserPoolError: 풀/브라우저 오류 (_run 참고)
+        """
+        return self._run(lambda client, remaining: client.request(message, remaining), timeout)
+
+    def chat(self, message: str, model: str = "claude-sonnet-4", timeout: float = None) -> Dict[str, Any]:
+        """풀의 브라우저로 puter.ai.chat 호출 (PuterSeleniumClient.chat과 같은 형식)"""
+        return self._run(lambda client, remaining: client.chat(message, model, remaining), timeout)
+
+    def chat_many(self, messages: List[Any], model: str = "claude-sonnet-4",
+                  timeout: float = None) -> List[Dict[str, Any]]:
+        """풀의 브라우저 하나에서 여러 요청을 동시에 처리"""
+        return self._run(lambda client, remaining: client.chat_many(messages, model, remaining), timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """풀 상태"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(size=self.size, live=self._live, waiting=self._waiting)
+        stats["idle"] = self._idle.qsize()
+        return stats
+
+    def close(self):
+        """모든 브라우저 종료 (사용 중인 브라우저는 반환될 때 종료)"""
+        self._closed = True
+        while True:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(client)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
 def main():
     """메인 함수"""
     client = None
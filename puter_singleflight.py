@@ -0,0 +1,74 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """진행 중인 호출 하나 (결과를 기다리는 요청들이 공유)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    동일한 키의 동시 호출을 하나로 합치는 single-flight 계층
+
+    같은 키로 이미 진행 중인 호출이 있으면 새로 실행하지 않고 그 결과를 함께 받습니다.
+    호출이 끝나면 키가 제거되므로 결과를 저장하는 캐시와는 별개로 동작합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"leaders": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        키에 대한 호출 실행 (이미 진행 중이면 그 결과를 기다림)
+
+        Args:
+            key: 호출을 구분하는 키
+            fn: 실제로 실행할 함수
+
+        Returns:
+            (결과, 다른 호출의 결과를 공유했는지 여부)
+
+        Raises:
+            fn에서 발생한 예외 (기다리던 요청에도 같은 예외 전달)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["leaders"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        """실행/공유 카운터"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
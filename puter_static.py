@@ -0,0 +1,98 @@
+import gzip
+import hashlib
+import os
+from typing import Dict, Iterable, Union
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class StaticPage:
+    """
+    시작 시 한 번 렌더링/압축해 두는 정적 페이지
+
+    원본, gzip, brotli(설치된 경우) 바이트를 미리 만들어 두고
+    요청마다 Accept-Encoding에 맞는 것을 골라 강한 ETag와 함께 반환합니다.
+    """
+
+    def __init__(self, body: Union[str, bytes], mimetype: str = "text/html; charset=utf-8",
+                 max_age: int = 300):
+        """
+        Args:
+            body: 페이지 내용
+            mimetype: Content-Type 헤더 값
+            max_age: Cache-Control max-age (초)
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        self.mimetype = mimetype
+        self.cache_control = f"public, max-age={max_age}"
+
+        digest = hashlib.sha256(body).hexdigest()[:32]
+
+        # 인코딩별 (본문, ETag) - 같은 내용이라도 표현이 다르면 강한 ETag도 달라야 함
+        self.variants = {"identity": (body, f'"{digest}"')}
+        self.variants["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"')
+        if brotli:
+            self.variants["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+
+        self.etags = [etag.strip('"') for _, etag in self.variants.values()]
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "StaticPage":
+        """파일 내용으로 정적 페이지 생성"""
+        with open(path, "rb") as f:
+            return cls(f.read(), **kwargs)
+
+    def choose_encoding(self) -> str:
+        """Accept-Encoding 헤더에 따라 보낼 인코딩 선택 (br > gzip > identity)"""
+        accepted = request.accept_encodings
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted[encoding]:
+                return encoding
+        return "identity"
+
+    def response(self) -> Response:
+        """현재 요청에 대한 응답 생성 (If-None-Match 일치 시 304)"""
+        encoding = self.choose_encoding()
+        body, etag = self.variants[encoding]
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding"
+        }
+
+        # 클라이언트가 가진 표현이 어느 것이든 내용은 같으므로 모든 ETag와 비교
+        if any(request.if_none_match.contains(tag) for tag in self.etags):
+            return Response(status=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        return Response(body, mimetype=self.mimetype, headers=headers)
+
+
+def load_static_pages(names: Iterable[str], directory: str = None) -> Dict[str, StaticPage]:
+    """
+    저장소의 정적 HTML 파일들을 미리 읽어 압축
+
+    Args:
+        names: 파일 이름 목록
+        directory: 파일이 있는 디렉터리 (기본값: 이 모듈이 있는 디렉터리)
+
+    Returns:
+        파일 이름 → 정적 페이지 (없는 파일은 제외)
+    """
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    pages = {}
+    for name in names:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            pages[name] = StaticPage.from_file(path)
+    return pages
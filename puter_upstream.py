@@ -0,0 +1,400 @@
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable, Iterator, Tuple, Union
+
+import httpx
+
+try:
+    import h2  # noqa: F401  HTTP/2 지원 여부 확인용
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class UpstreamError(Exception):
+    """업스트림 호출 실패"""
+
+
+class UpstreamBusy(UpstreamError):
+    """업스트림이 지금은 요청을 받을 수 없음 (retry_after초 후 재시도)"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AsyncUpstreamEngine:
+    """
+    asyncio 기반 업스트림 엔진
+
+    프로세스당 하나의 이벤트 루프 스레드와 하나의 풀링된 HTTP 클라이언트를 사용합니다.
+    단건 요청(chat/stream)은 호출한 Flask 워커 스레드가 결과를 기다리므로 동시 호출 수가
+    gunicorn 스레드 수로 제한되지만, 배치(chat_many)는 스레드 하나가 루프에서 asyncio.gather로
+    여러 요청을 동시에 진행하므로 max_connections까지 늘어납니다.
+    측정값 (스텁 업스트림 지연 0.5초, max_connections=100, 배치 320건, 호출 스레드 하나):
+    동시 32건은 5.4초(이론값 5.0초), 동시 64건은 6.0~7.3초(실제 동시 진행 약 50건),
+    동시 100건은 httpcore 커넥션 풀 관리 비용이 커져 15초 이상으로 오히려 느려졌습니다.
+    """
+
+    def __init__(self, base_url: str, chat_path: str = "/ai/chat",
+                 max_connections: int = 100, max_keepalive: int = 20,
+                 keepalive_expiry: float = 30.0, timeout: float = 60.0,
+                 http2: bool = True):
+        """
+        엔진 초기화
+
+        Args:
+            base_url: 업스트림 서버 URL
+            chat_path: 채팅 API 경로
+            max_connections: 호스트당 최대 동시 커넥션 수
+            max_keepalive: 유지할 keep-alive 커넥션 수
+            keepalive_expiry: keep-alive 커넥션 유지 시간 (초)
+            timeout: 요청 타임아웃 (초)
+            http2: HTTP/2 사용 여부 (h2 패키지가 있을 때만 적용)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.chat_path = chat_path
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2 and HTTP2_AVAILABLE
+
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """이벤트 루프 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+
+            ready = threading.Event()
+
+            def run_loop():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    limits=self.limits,
+                    timeout=self.timeout,
+                    http2=self.http2
+                )
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(
+                target=run_loop, name="puter-upstream", daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+
+    def close(self):
+        """HTTP 클라이언트와 이벤트 루프 종료"""
+        with self._lock:
+            if not self._loop:
+                return
+
+            future = asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop)
+            future.result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+            self._thread = None
+            self._client = None
+
+    async def achat(self, message: str, model: str = "claude-sonnet-4",
+                    system_prompt: Optional[str] = None,
+                    history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """
+        업스트림 채팅 호출 (코루틴, 엔진 루프에서 실행)
+
+        Args:
+            message: 사용자 메시지
+            model: AI 모델
+            system_prompt: 시스템 프롬프트
+            history: 이전 대화 턴 목록 ({"role", "content"})
+
+        Returns:
+            업스트림 응답 JSON
+        """
+        payload = build_payload(message, model, system_prompt, history)
+
+        try:
+            response = await self._client.post(self.chat_path, json=payload)
+        except httpx.HTTPError as e:
+            raise UpstreamError(f"업스트림 연결 오류: {e}") from e
+
+        if response.status_code != 200:
+            raise UpstreamError(f"업스트림 오류: {response.status_code} - {response.text}")
+
+        return response.json()
+
+    async def astream(self, message: str, model: str = "claude-sonnet-4",
+                      system_prompt: Optional[str] = None,
+                      history: Optional[List[Dict[str, str]]] = None) -> AsyncIterator[str]:
+        """
+        업스트림 채팅 스트리밍 호출 (비동기 제너레이터, 엔진 루프에서 실행)
+
+        "stream": true로 요청하고 SSE(text/event-stream) 또는 NDJSON 응답의 텍스트 조각을
+        도착하는 즉시 돌려줍니다. 업스트림이 스트리밍을 지원하지 않아 JSON 한 번으로 응답하면
+        전체 텍스트를 한 조각으로 돌려줍니다.
+
+        Yields:
+            응답 텍스트 조각
+        """
+        payload = build_payload(message, model, system_prompt, history)
+        payload["stream"] = True
+
+        try:
+            async with self._client.stream("POST", self.chat_path, json=payload) as response:
+                if response.status_code != 200:
+                    body = (await response.aread()).decode("utf-8", "replace")
+                    raise UpstreamError(f"업스트림 오류: {response.status_code} - {body}")
+
+                content_type = response.headers.get("Content-Type", "")
+                if "text/event-stream" not in content_type and "ndjson" not in content_type:
+                    yield extract_response_text(json.loads(await response.aread()))
+                    return
+
+                async for line in response.aiter_lines():
+                    event = parse_stream_line(line)
+                    if event is None:
+                        continue
+                    if event is STREAM_DONE:
+                        return
+                    text = extract_delta_text(event)
+                    if text:
+                        yield text
+        except httpx.HTTPError as e:
+            raise UpstreamError(f"업스트림 연결 오류: {e}") from e
+
+    def _relay(self, produce: Callable[[Callable[[Any], None]], Any], timeout: float) -> Iterator[Any]:
+        """
+        엔진 루프에서 produce(emit)를 실행하고 emit으로 보낸 값을 호출 스레드에서 차례로 반환
+
+        호출 스레드가 중간에 읽기를 멈추면 (클라이언트 연결 종료 등) 루프의 작업도 취소합니다.
+
+        Args:
+            produce: emit 함수를 받아 값을 보내는 코루틴 함수
+            timeout: 다음 값을 기다릴 최대 시간 (초)
+        """
+        self.start()
+        items = queue.Queue()
+
+        async def run():
+            try:
+                await produce(lambda value: items.put(("value", value)))
+            except Exception as e:
+                items.put(("error", e))
+            else:
+                items.put(("done", None))
+
+        future = asyncio.run_coroutine_threadsafe(run(), self._loop)
+        try:
+            while True:
+                try:
+                    kind, value = items.get(timeout=timeout)
+                except queue.Empty:
+                    raise UpstreamError("업스트림 응답 시간 초과")
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise value
+                yield value
+        finally:
+            future.cancel()
+
+    def stream(self, message: str, model: str = "claude-sonnet-4",
+               system_prompt: Optional[str] = None,
+               history: Optional[List[Dict[str, str]]] = None) -> Iterator[str]:
+        """
+        업스트림 채팅 스트리밍 호출 (동기 제너레이터, astream의 조각을 도착하는 즉시 전달)
+
+        Yields:
+            응답 텍스트 조각
+        """
+        async def produce(emit):
+            async for text in self.astream(message, model, system_prompt, history):
+                emit(text)
+
+        return self._relay(produce, self.timeout + 5)
+
+    def chat_many(self, requests: List[Tuple[str, str, Optional[str]]],
+                  max_concurrency: int = 16) -> Iterator[Tuple[int, Union[str, Exception], float]]:
+        """
+        여러 채팅 요청을 엔진 루프에서 asyncio.gather로 동시에 실행 (호출 스레드 하나로 처리)
+
+        Args:
+            requests: (메시지, 모델, 시스템 프롬프트) 목록
+            max_concurrency: 동시에 진행할 최대 요청 수
+
+        Yields:
+            완료되는 순서대로 (요청 인덱스, 응답 텍스트 또는 예외, 소요 시간)
+        """
+        async def produce(emit):
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def one(index, request):
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        outcome = extract_response_text(await self.achat(*request))
+                    except Exception as e:
+                        outcome = e
+                    emit((index, outcome, time.perf_counter() - start))
+
+            await asyncio.gather(*(one(index, request) for index, request in enumerate(requests)))
+
+        return self._relay(produce, self.timeout + 5)
+
+    def chat(self, message: str, model: str = "claude-sonnet-4",
+             system_prompt: Optional[str] = None,
+             history: Optional[List[Dict[str, str]]] = None) -> str:
+        """
+        업스트림 채팅 호출 (동기 래퍼)
+
+        Args:
+            message: 사용자 메시지
+            model: AI 모델
+            system_prompt: 시스템 프롬프트
+            history: 이전 대화 턴 목록 ({"role", "content"})
+
+        Returns:
+            AI 응답 텍스트
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(
+            self.achat(message, model, system_prompt, history), self._loop
+        )
+        try:
+            result = future.result(timeout=self.timeout + 5)
+        except TimeoutError as e:
+            future.cancel()
+            raise UpstreamError("업스트림 응답 시간 초과") from e
+
+        return extract_response_text(result)
+
+
+def build_payload(message: str, model: str, system_prompt: Optional[str] = None,
+                  history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+    """업스트림 채팅 요청 본문"""
+    payload = {
+        "message": message,
+        "model": model
+    }
+
+    if system_prompt:
+        payload["system_prompt"] = system_prompt
+
+    if history:
+        payload["history"] = history
+
+    return payload
+
+
+# 스트림 종료 표시 (SSE의 "data: [DONE]")
+STREAM_DONE = object()
+
+
+def parse_stream_line(line: str):
+    """
+    스트리밍 응답 한 줄 해석 (SSE "data:" 줄 또는 NDJSON 줄)
+
+    Returns:
+        이벤트 JSON, 스트림 종료면 STREAM_DONE, 데이터가 없는 줄이면 None
+    """
+    line = line.strip()
+    if not line or line.startswith(":"):
+        return None
+
+    if line.startswith("data:"):
+        line = line[5:].strip()
+        if line == "[DONE]":
+            return STREAM_DONE
+    elif not line.startswith("{"):
+        # SSE의 event:/id:/retry: 줄
+        return None
+
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise UpstreamError(f"스트리밍 응답 형식이 올바르지 않습니다: {line[:100]}") from e
+
+
+def extract_delta_text(event: Dict[str, Any]) -> Optional[str]:
+    """스트리밍 이벤트에서 텍스트 조각 추출"""
+    if event.get("success") is False:
+        raise UpstreamError(f"업스트림 오류: {event.get('error', '알 수 없는 오류')}")
+
+    # Puter SDK 형식: {"type": "text", "text": ...}
+    if isinstance(event.get("text"), str):
+        return event["text"]
+
+    # 이 서버의 /chat/stream 형식: {"token": ...}
+    if isinstance(event.get("token"), str):
+        return event["token"]
+
+    # OpenAI 호환 형식: {"choices": [{"delta": {"content": ...}}]}
+    choices = event.get("choices")
+    if choices:
+        return (choices[0].get("delta") or {}).get("content")
+
+    return None
+
+
+def extract_response_text(result: Dict[str, Any]) -> str:
+    """업스트림 응답 JSON에서 응답 텍스트 추출"""
+    if "response" in result:
+        return result["response"]
+
+    # Puter SDK 형식: {"message": {"content": [{"text": ...}]}}
+    message = result.get("message")
+    if isinstance(message, dict) and message.get("content"):
+        return message["content"][0]["text"]
+
+    # OpenAI 호환 형식: {"choices": [{"message": {"content": ...}}]}
+    if result.get("choices"):
+        return result["choices"][0]["message"]["content"]
+
+    raise UpstreamError("응답 형식이 올바르지 않습니다.")
+
+
+_engine = None
+_engine_pid = None
+_engine_lock = threading.Lock()
+
+
+def get_upstream_engine() -> Optional[AsyncUpstreamEngine]:
+    """
+    프로세스 공용 업스트림 엔진 반환
+
+    PUTER_UPSTREAM_URL 환경변수가 없으면 None을 반환합니다 (시뮬레이션 모드).
+    fork된 워커 프로세스에서는 새 엔진을 생성합니다.
+    """
+    global _engine, _engine_pid
+
+    base_url = os.environ.get("PUTER_UPSTREAM_URL")
+    if not base_url:
+        return None
+
+    with _engine_lock:
+        if _engine is None or _engine_pid != os.getpid():
+            _engine = AsyncUpstreamEngine(
+                base_url,
+                chat_path=os.environ.get("PUTER_UPSTREAM_CHAT_PATH", "/ai/chat"),
+                max_connections=int(os.environ.get("PUTER_UPSTREAM_MAX_CONNECTIONS", 100)),
+                max_keepalive=int(os.environ.get("PUTER_UPSTREAM_MAX_KEEPALIVE", 20)),
+                timeout=float(os.environ.get("PUTER_UPSTREAM_TIMEOUT", 60)),
+                http2=os.environ.get("PUTER_UPSTREAM_HTTP2", "1") != "0"
+            )
+            _engine_pid = os.getpid()
+        return _engine
@@ -0,0 +1,161 @@
+import argparse
+import functools
+import importlib
+import multiprocessing
+import os
+import sys
+import tempfile
+
+# 실행할 수 있는 Flask 앱 모듈
+APP_MODULES = ("puter_flask_server", "app", "cloudtype_app")
+
+
+def load_app(name: str = None):
+    """
+    Flask 앱 모듈을 불러와 app 객체 반환
+
+    Args:
+        name: 앱 모듈 이름 (기본값: PUTER_APP 환경변수 또는 puter_flask_server)
+    """
+    name = name or os.environ.get("PUTER_APP", "puter_flask_server")
+    if name not in APP_MODULES:
+        raise ValueError(f"지원하지 않는 앱: {name} (가능: {', '.join(APP_MODULES)})")
+    return importlib.import_module(name).app
+
+
+def default_workers() -> int:
+    """기본 워커 프로세스 수 (CPU 코어 수 기반)"""
+    return int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+
+def worker_backend(worker):
+    """워커가 불러온 앱의 응답 백엔드 (앱을 불러오기 전이면 None)"""
+    app = getattr(worker, "wsgi", None)
+    server = app.extensions.get("puter") if app is not None else None
+    return server.backend if server else None
+
+
+def post_worker_init(worker):
+    """워커 시작 시 백엔드 준비 (브라우저 백엔드는 fork 이후 브라우저를 미리 띄움)"""
+    start = getattr(worker_backend(worker), "start", None)
+    if start:
+        start()
+
+
+def on_worker_exit(server, worker):
+    """워커 종료 시 업스트림 커넥션 풀과 백엔드 정리"""
+    from puter_upstream import get_upstream_engine
+
+    engine = get_upstream_engine()
+    if engine:
+        engine.close()
+
+    close = getattr(worker_backend(worker), "close", None)
+    if close:
+        close()
+
+
+def run_gunicorn(app_name: str, host: str, port: int, workers: int, threads: int,
+                 timeout: int, graceful_timeout: int, preload: bool, on_exit=None):
+    """멀티 프로세스 + 멀티 스레드 gunicorn 서버로 실행 (on_exit는 마스터 종료 시 호출)"""
+    from gunicorn.app.base import BaseApplication
+
+    class PuterApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{host}:{port}",
+                "workers": workers,
+                # SSE/배치 요청이 스레드 하나를 오래 점유하므로 스레드 워커 사용
+                "worker_class": "gthread",
+                "threads": threads,
+                "timeout": timeout,
+                "graceful_timeout": graceful_timeout,
+                "keepalive": 5,
+                "preload_app": preload,
+                "post_worker_init": post_worker_init,
+                "worker_exit": on_worker_exit,
+                "on_exit": lambda server: on_exit and on_exit(),
+                "accesslog": os.environ.get("PUTER_ACCESS_LOG"),
+                "errorlog": "-"
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app(app_name)
+
+    PuterApplication().run()
+
+
+def run_conversations_db(app_name: str) -> str:
+    """
+    이번 실행의 워커들만 공유하는 대화 저장소 파일 생성
+
+    다른 앱/배포와 파일을 공유하지 않고 재시작하면 새로 시작합니다.
+    대화를 재시작 후에도 유지하려면 PUTER_CONVERSATIONS_DB를 직접 지정합니다.
+    """
+    fd, path = tempfile.mkstemp(prefix=f"puter_conversations_{app_name}_", suffix=".db")
+    os.close(fd)
+    return path
+
+
+def remove_sqlite_files(path: str):
+    """SQLite 파일과 WAL 파일 삭제"""
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def run_waitress(app_name: str, host: str, port: int, threads: int):
+    """gunicorn을 쓸 수 없는 환경(Windows)에서 waitress로 실행"""
+    from waitress import serve
+
+    serve(load_app(app_name), host=host, port=port, threads=threads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Puter AI 서버 운영용 실행 진입점")
+    parser.add_argument("--app", default=os.environ.get("PUTER_APP", "puter_flask_server"),
+                        choices=APP_MODULES, help="실행할 앱 모듈")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="워커 프로세스 수 (WEB_CONCURRENCY)")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("PUTER_THREADS", 8)),
+                        help="워커당 스레드 수 (PUTER_THREADS)")
+    parser.add_argument("--timeout", type=int, default=int(os.environ.get("PUTER_TIMEOUT", 120)),
+                        help="요청 처리 타임아웃 (초)")
+    parser.add_argument("--graceful-timeout", type=int,
+                        default=int(os.environ.get("PUTER_GRACEFUL_TIMEOUT", 30)),
+                        help="종료 시 처리 중인 요청을 기다리는 시간 (초)")
+    parser.add_argument("--no-preload", action="store_true",
+                        help="마스터 프로세스에서 앱을 미리 불러오지 않음")
+    args = parser.parse_args()
+
+    print(f"🚀 {args.app} 앱을 시작합니다: http://{args.host}:{args.port}")
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        gunicorn = None
+
+    if gunicorn and sys.platform != "win32":
+        print(f"⚙️ gunicorn: 워커 {args.workers}개 × 스레드 {args.threads}개")
+        on_exit = None
+        if args.workers > 1 and not os.environ.get("PUTER_CONVERSATIONS_DB"):
+            # 대화 세션은 워커 프로세스 간에 공유해야 하므로 이번 실행 전용 SQLite 파일 사용
+            db_path = run_conversations_db(args.app)
+            os.environ["PUTER_CONVERSATIONS_DB"] = db_path
+            on_exit = functools.partial(remove_sqlite_files, db_path)
+            print(f"💬 대화 저장소: {db_path} (종료 시 삭제, 유지하려면 PUTER_CONVERSATIONS_DB 지정)")
+        run_gunicorn(args.app, args.host, args.port, args.workers, args.threads,
+                     args.timeout, args.graceful_timeout, not args.no_preload, on_exit)
+    else:
+        print(f"⚙️ waitress: 스레드 {args.threads}개")
+        run_waitress(args.app, args.host, args.port, args.threads)
+
+
+if __name__ == "__main__":
+    main()
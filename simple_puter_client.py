@@ -1,7 +1,88 @@
 import requests
 import json
 import time
-from typing import Optional, Dict, Any
+import threading
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Callable, Union
+
+# 속도 제한으로 간주하는 HTTP 상태 코드
+THROTTLE_STATUS_CODES = (429, 503)
+# 서버가 허용하는 요청별 캐시 모드
+CACHE_MODES = ("use", "bypass", "refresh")
+# /chat/batch 한 번에 보낼 최대 요청 수 (서버 기본 PUTER_BATCH_MAX_SIZE)
+BATCH_MAX_SIZE = 1000
+
+class AdaptiveRateLimiter:
+    """429/503 응답에 맞춰 속도를 조절하는 토큰 버킷 속도 제한기"""
+    
+    def __init__(self, rate: float = 5.0, burst: int = 5,
+                 min_rate: float = 0.2, max_rate: float = 50.0, increase: float = 0.5):
+        """
+        속도 제한기 초기화
+        
+        Args:
+            rate: 초당 허용 요청 수 (초기값)
+            burst: 한 번에 몰아서 보낼 수 있는 최대 요청 수
+            min_rate: 속도를 줄일 때의 하한
+            max_rate: 속도를 늘릴 때의 상한
+            increase: 성공 응답마다 늘릴 초당 요청 수
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """요청 하나를 보낼 수 있을 때까지 대기"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    
+                    wait = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait)
+    
+    def on_success(self):
+        """성공 응답: 속도를 조금씩 늘림 (가산 증가)"""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+    
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """
+        속도 제한 응답: 속도를 절반으로 줄이고 Retry-After 동안 전송 중단 (승산 감소)
+        
+        Args:
+            retry_after: 서버가 지정한 대기 시간 (초)
+        """
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+            if retry_after:
+                self.paused_until = max(self.paused_until, self.updated + retry_after)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더 값(초)을 파싱 (HTTP 날짜 형식은 무시)"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
 
 class SimplePuterClient:
     """Flask 서버에 연결하는 간단한 Puter AI 클라이언트"""
@@ -17,7 +98,8 @@ class SimplePuterClient:
         self.session = requests.Session()
     
     def chat(self, message: str, model: str = "claude-sonnet-4", 
-             system_prompt: Optional[str] = None) -> Dict[str, Any]:
+             system_prompt: Optional[str] = None,
+             conversation_id: Optional[str] = None) -> Dict[str, Any]:
         """
         AI와 채팅
         
@@ -25,6 +107,7 @@ class SimplePuterClient:
             message: 사용자 메시지
             model: AI 모델
             system_prompt: 시스템 프롬프트
+            conversation_id: 서버 측 대화 ID (이전 대화는 서버가 이어 붙임)
             
         Returns:
             응답 결과
@@ -38,6 +121,9 @@ class SimplePuterClient:
             if system_prompt:
                 payload["system_prompt"] = system_prompt
             
+            if conversation_id:
+                payload["conversation_id"] = conversation_id
+            
             response = self.session.post(
                 f"{self.server_url}/chat",
                 json=payload,
@@ -49,7 +135,9 @@ class SimplePuterClient:
             else:
                 return {
                     "success": False,
-                    "error": f"서버 오류: {response.status_code}"
+                    "error": f"서버 오류: {response.status_code}",
+                    "status_code": response.status_code,
+                    "retry_after": parse_retry_after(response.headers.get("Retry-After"))
                 }
                 
         except requests.exceptions.RequestException as e:
@@ -63,6 +151,204 @@ class SimplePuterClient:
                 "error": f"오류: {str(e)}"
             }
     
+    def start_conversation(self) -> Optional[str]:
+        """
+        서버 측 대화 세션 생성
+        
+        Returns:
+            대화 ID (서버가 대화 세션을 지원하지 않으면 None)
+        """
+        try:
+            response = self.session.post(f"{self.server_url}/conversations", timeout=10)
+            if response.status_code == 201:
+                return response.json().get("conversation_id")
+        except requests.exceptions.RequestException:
+            pass
+        return None
+    
+    def batch_chat(self, messages: List[str], model: str = "claude-sonnet-4",
+                   system_prompt: Optional[str] = None, max_workers: int = 8,
+                   rate_limiter: Optional[AdaptiveRateLimiter] = None, max_retries: int = 3,
+                   progress_callback: Optional[Callable[[int, int, int, Dict[str, Any]], None]] = None
+                   ) -> List[Dict[str, Any]]:
+        """
+        여러 메시지를 클라이언트에서 동시에 처리 (/chat 엔드포인트 사용)
+        
+        Args:
+            messages: 메시지 목록
+            model: AI 모델
+            system_prompt: 시스템 프롬프트
+            max_workers: 동시에 보낼 최대 요청 수
+            rate_limiter: 속도 제한기 (None이면 기본 설정으로 생성)
+            max_retries: 429/503 응답 시 재시도 횟수
+            progress_callback: 요청 하나가 끝날 때마다 (완료 수, 전체 수, 인덱스, 응답)으로 호출
+            
+        Returns:
+            요청 순서대로 정렬된 {"message", "response"} 목록
+        """
+        limiter = rate_limiter or AdaptiveRateLimiter()
+        
+        # 동시 요청 수만큼 커넥션을 재사용할 수 있도록 풀 크기 조정
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount(self.server_url, adapter)
+        
+        def run(message):
+            for attempt in range(max_retries + 1):
+                limiter.acquire()
+                response = self.chat(message, model, system_prompt)
+                
+                if response.get("status_code") not in THROTTLE_STATUS_CODES:
+                    if response.get("success"):
+                        limiter.on_success()
+                    return response
+                
+                limiter.on_throttled(response.get("retry_after"))
+            
+            return response
+        
+        results = [None] * len(messages)
+        completed = 0
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run, message): i for i, message in enumerate(messages)}
+            
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = {
+                    "message": messages[index],
+                    "response": future.result()
+                }
+                completed += 1
+                
+                if progress_callback:
+                    progress_callback(completed, len(messages), index, results[index]["response"])
+        
+        return results
+    
+    def chat_batch(self, messages: List[Union[str, Dict[str, Any]]], model: str = "claude-sonnet-4",
+                   system_prompt: Optional[str] = None,
+                   max_concurrency: Optional[int] = None, cache: str = "use",
+                   batch_size: int = BATCH_MAX_SIZE,
+                   rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                   max_retries: int = 3) -> Optional[List[Dict[str, Any]]]:
+        """
+        여러 메시지를 서버의 /chat/batch 엔드포인트로 처리
+        
+        서버의 배치 크기 한도를 넘는 목록은 batch_size개씩 나눠 보내고 결과를 순서대로 합칩니다.
+        서버가 429/503으로 배치 전체나 일부 요청을 거절하면 Retry-After만큼 기다린 뒤
+        거절된 요청만 다시 보냅니다.
+        
+        Args:
+            messages: 메시지 문자열 또는 {"message", "model", "system_prompt", "cache"} 요청 목록
+            model: AI 모델 (요청에 없을 때 기본값)
+            system_prompt: 시스템 프롬프트 (요청에 없을 때 기본값)
+            max_concurrency: 서버 측 동시 처리 수 (None이면 서버 기본값)
+            cache: 캐시 모드 (요청에 없을 때 기본값, use/bypass/refresh)
+            batch_size: 요청 한 번에 보낼 최대 메시지 수 (서버의 PUTER_BATCH_MAX_SIZE 이하)
+            rate_limiter: 속도 제한기 (None이면 기본 설정으로 생성)
+            max_retries: 429/503 응답 시 재시도 횟수
+            
+        Returns:
+            요청 순서대로 정렬된 응답 목록 (서버가 배치를 지원하지 않으면 None)
+            
+        Raises:
+            ValueError: 캐시 모드가 올바르지 않은 경우
+        """
+        if cache not in CACHE_MODES:
+            raise ValueError(f"cache는 {', '.join(CACHE_MODES)} 중 하나여야 합니다.")
+        for index, item in enumerate(messages):
+            if isinstance(item, dict) and item.get("cache", cache) not in CACHE_MODES:
+                raise ValueError(f"{index}번 요청의 cache는 {', '.join(CACHE_MODES)} 중 하나여야 합니다.")
+        
+        limiter = rate_limiter or AdaptiveRateLimiter()
+        
+        results = []
+        for start in range(0, len(messages), max(1, batch_size)):
+            part = self._retry_batch(messages[start:start + batch_size], model, system_prompt,
+                                     max_concurrency, cache, limiter, max_retries)
+            if part is None:
+                return None
+            results.extend(part)
+        return results
+    
+    def _retry_batch(self, messages: List[Union[str, Dict[str, Any]]], model: str,
+                     system_prompt: Optional[str], max_concurrency: Optional[int], cache: str,
+                     limiter: AdaptiveRateLimiter, max_retries: int) -> Optional[List[Dict[str, Any]]]:
+        """배치 하나 전송 (429/503으로 거절된 요청은 Retry-After 이후 다시 전송)"""
+        results = [None] * len(messages)
+        pending = list(range(len(messages)))
+        
+        for _ in range(max_retries + 1):
+            limiter.acquire()
+            part = self._post_batch([messages[i] for i in pending], model, system_prompt,
+                                    max_concurrency, cache)
+            if part is None:
+                return None
+            
+            throttled = []
+            for index, result in zip(pending, part):
+                results[index] = result
+                if result.get("status_code") in THROTTLE_STATUS_CODES:
+                    throttled.append(index)
+            
+            if not throttled:
+                limiter.on_success()
+                break
+            
+            limiter.on_throttled(max(results[i].get("retry_after") or 0 for i in throttled))
+            pending = throttled
+        
+        return results
+    
+    def _post_batch(self, messages: List[Union[str, Dict[str, Any]]], model: str,
+                    system_prompt: Optional[str], max_concurrency: Optional[int],
+                    cache: str) -> Optional[List[Dict[str, Any]]]:
+        """/chat/batch 요청 하나 전송"""
+        payload = {
+            "model": model
+        }
+        
+        # 모두 문자열이면 messages, 요청별 옵션이 있으면 requests로 전송
+        if all(isinstance(item, str) for item in messages):
+            payload["messages"] = messages
+        else:
+            payload["requests"] = [
+                item if isinstance(item, dict) else {"message": item}
+                for item in messages
+            ]
+        
+        if system_prompt:
+            payload["system_prompt"] = system_prompt
+        if max_concurrency:
+            payload["max_concurrency"] = max_concurrency
+        if cache != "use":
+            payload["cache"] = cache
+        
+        try:
+            response = self.session.post(
+                f"{self.server_url}/chat/batch",
+                json=payload,
+                timeout=30 + len(messages)
+            )
+        except requests.exceptions.RequestException as e:
+            error = {"success": False, "error": f"네트워크 오류: {str(e)}"}
+            return [error] * len(messages)
+        
+        # 배치 엔드포인트가 없는 이전 버전 서버
+        if response.status_code in (404, 405):
+            return None
+        
+        if response.status_code != 200:
+            error = {
+                "success": False,
+                "error": f"서버 오류: {response.status_code}",
+                "status_code": response.status_code,
+                "retry_after": parse_retry_after(response.headers.get("Retry-After"))
+            }
+            return [error] * len(messages)
+        
+        return response.json().get("results", [])
+    
     def health_check(self) -> bool:
         """서버 상태 확인"""
         try:
@@ -105,6 +391,9 @@ def interactive_chat():
     if not system_prompt:
         system_prompt = "당신은 도움이 되는 AI 어시스턴트입니다. 한국어로 답변해주세요."
     
+    # 이전 대화는 서버가 보관하므로 새 메시지만 전송
+    conversation_id = client.start_conversation()
+    
     print(f"\n🤖 시스템 프롬프트: {system_prompt}")
     print("채팅을 시작합니다! 종료하려면 'quit' 또는 'exit'를 입력하세요.\n")
     
@@ -125,7 +414,8 @@ def interactive_chat():
         response = client.chat(
             message=user_input,
             model="claude-sonnet-4",
-            system_prompt=system_prompt
+            system_prompt=system_prompt,
+            conversation_id=conversation_id
         )
         
         if response.get("success"):
@@ -134,38 +424,40 @@ def interactive_chat():
         else:
             print(f"❌ 오류: {response.get('error', '알 수 없는 오류')}\n")
 
-def batch_chat(messages: list, system_prompt: str = None) -> list:
+def batch_chat(messages: list, system_prompt: str = None,
+               progress_callback: Optional[Callable[[int, int, int, Dict[str, Any]], None]] = None) -> list:
     """
     여러 메시지를 일괄 처리
     
     Args:
         messages: 메시지 목록
         system_prompt: 시스템 프롬프트
+        progress_callback: 요청마다 (완료 수, 전체 수, 인덱스, 응답)으로 호출되는 진행 상황 콜백
+            (서버 일괄 처리는 배치 응답이 도착한 뒤 요청 순서대로 호출)
         
     Returns:
         응답 목록
     """
     client = SimplePuterClient()
-    responses = []
     
-    for i, message in enumerate(messages, 1):
-        print(f"처리 중... ({i}/{len(messages)})")
-        
-        response = client.chat(
-            message=message,
-            model="claude-sonnet-4",
-            system_prompt=system_prompt
-        )
-        
-        responses.append({
-            "message": message,
-            "response": response
-        })
-        
-        # 요청 간 간격
-        time.sleep(1)
+    # 서버에서 병렬로 일괄 처리
+    results = client.chat_batch(messages, system_prompt=system_prompt)
+    if results is not None:
+        responses = [
+            {"message": message, "response": response}
+            for message, response in zip(messages, results)
+        ]
+        if progress_callback:
+            for index, item in enumerate(responses):
+                progress_callback(index + 1, len(responses), index, item["response"])
+        return responses
     
-    return responses
+    # 배치 엔드포인트를 지원하지 않는 서버는 클라이언트에서 동시에 처리
+    return client.batch_chat(
+        messages,
+        system_prompt=system_prompt,
+        progress_callback=progress_callback
+    )
 
 def save_conversation(responses: list, filename: str = "conversation.json"):
     """대화 내용을 파일로 저장"""
@@ -0,0 +1,115 @@
+import argparse
+import json
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class StubUpstreamHandler(BaseHTTPRequestHandler):
+    """Puter 업스트림을 흉내 내는 로컬 테스트용 핸들러"""
+
+    # 서버 시작 시 설정되는 값
+    latency = 0.0
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문을 따로 쓰므로 Nagle 알고리즘을 끄지 않으면 keep-alive 요청마다 40ms 지연 (delayed ACK)
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_json(400, {"error": "잘못된 JSON"})
+            return
+
+        text = f"스텁 응답: {payload.get('message', '')}"
+        if payload.get("stream"):
+            self.send_stream(text.split(" "))
+            return
+
+        # 모델 지연 시간 시뮬레이션
+        if self.latency:
+            time.sleep(self.latency)
+
+        self.send_json(200, {
+            "message": {
+                "role": "assistant",
+                "content": [{
+                    "type": "text",
+                    "text": text
+                }]
+            },
+            "model": payload.get("model")
+        })
+
+    def send_stream(self, words):
+        """단어마다 SSE 이벤트 하나씩 전송 (지연 시간을 단어 수만큼 나누어 생성 속도 흉내)"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        # 길이를 모르는 응답이므로 연결을 닫아 끝을 알림
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        for i, word in enumerate(words):
+            if self.latency:
+                time.sleep(self.latency / len(words))
+            token = word if i == len(words) - 1 else word + " "
+            event = json.dumps({"type": "text", "text": token}, ensure_ascii=False)
+            self.wfile.write(f"data: {event}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def do_GET(self):
+        self.send_json(200, {"status": "ok"})
+
+    def send_json(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 부하 테스트 시 로그 출력 비용을 줄이기 위해 생략
+        pass
+
+
+class StubUpstreamServer(ThreadingHTTPServer):
+    """동시 접속이 많은 부하 테스트를 위해 listen 대기열을 늘린 서버"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def create_stub_server(host: str = "127.0.0.1", port: int = 8765,
+                       latency: float = 0.0) -> ThreadingHTTPServer:
+    """
+    스텁 업스트림 서버 생성
+
+    Args:
+        host: 바인딩 주소
+        port: 포트 (0이면 임의 포트)
+        latency: 응답마다 추가할 지연 시간 (초)
+
+    Returns:
+        serve_forever()로 실행할 수 있는 서버 인스턴스
+    """
+    handler = type("ConfiguredStubHandler", (StubUpstreamHandler,), {"latency": latency})
+    return StubUpstreamServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 스텁 업스트림 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 시간 (초)")
+    args = parser.parse_args()
+
+    server = create_stub_server(args.host, args.port, args.latency)
+    print(f"🧪 스텁 업스트림 서버: http://{args.host}:{server.server_port} (지연 {args.latency}초)")
+    print(f"PUTER_UPSTREAM_URL=http://{args.host}:{server.server_port} 로 Flask 서버를 실행하세요.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+
+from puter_conversations import ConversationStore
+
+
+def test_concurrent_appends_keep_every_turn(tmp_path):
+    store = ConversationStore(db_path=str(tmp_path / "conversations.db"))
+    conversation_id = store.create()
+    errors = []
+
+    def append_many(worker):
+        try:
+            for i in range(25):
+                store.append(conversation_id, ("user", f"{worker}-{i}"), ("assistant", f"{worker}-{i}"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=append_many, args=(worker,)) for worker in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    turns = store.turns(conversation_id)
+    assert len(turns) == 100
+    # 한 번에 추가한 사용자/AI 턴은 붙어 있어야 함
+    for user, assistant in zip(turns[::2], turns[1::2]):
+        assert user[0] == "user" and assistant[0] == "assistant"
+        assert user[1] == assistant[1]
+
+
+def test_stores_sharing_a_database(tmp_path):
+    db_path = str(tmp_path / "conversations.db")
+    store_a = ConversationStore(db_path=db_path)
+    store_b = ConversationStore(db_path=db_path)
+
+    conversation_id = store_a.create()
+    assert store_b.exists(conversation_id)
+    assert store_b.history(conversation_id) == []
+
+    store_a.append(conversation_id, ("user", "안녕"), ("assistant", "안녕하세요"))
+    store_b.append(conversation_id, ("user", "두 번째"), ("assistant", "네"))
+
+    # 다른 저장소가 추가한 턴도 보여야 함 (메모리 캐시가 오래된 내용을 반환하지 않음)
+    expected = ["안녕", "안녕하세요", "두 번째", "네"]
+    assert [turn["content"] for turn in store_a.history(conversation_id)] == expected
+    assert [turn["content"] for turn in store_b.history(conversation_id)] == expected
+
+    assert store_b.delete(conversation_id)
+    assert store_a.history(conversation_id) is None
+
+
+def test_memory_store_without_database():
+    store = ConversationStore(max_turns=2)
+    conversation_id = store.create()
+    store.append(conversation_id, ("user", "a"), ("assistant", "b"), ("user", "c"))
+
+    assert [turn["content"] for turn in store.history(conversation_id)] == ["b", "c"]
+    assert store.history("missing") is None
+
+
+def test_database_keeps_only_recent_turns(tmp_path):
+    db_path = str(tmp_path / "conversations.db")
+    store = ConversationStore(max_turns=4, db_path=db_path)
+    conversation_id = store.create()
+    for i in range(3):
+        store.append(conversation_id, ("user", f"q{i}"), ("assistant", f"a{i}"))
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT content FROM turns ORDER BY seq").fetchall()
+    assert [row[0] for row in rows] == ["q1", "a1", "q2", "a2"]
+    assert [turn["content"] for turn in store.history(conversation_id)] == ["q1", "a1", "q2", "a2"]
+
+
+def test_idle_conversations_expire(tmp_path):
+    db_path = str(tmp_path / "conversations.db")
+    # 생성만으로는 파일을 열지 않음 (gunicorn 마스터에서 만들어도 워커가 처음 사용할 때 연결)
+    store = ConversationStore(db_path=db_path, ttl=3600, evict_interval=0)
+    assert not (tmp_path / "conversations.db").exists()
+
+    old_id = store.create()
+    store.append(old_id, ("user", "오래된 대화"))
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE conversations SET updated_at = updated_at - 7200 WHERE id = ?", (old_id,))
+
+    new_id = store.create()
+    assert store.history(old_id) is None
+    assert store.history(new_id) == []
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0] == 0
@@ -0,0 +1,48 @@
+import io
+import json
+
+import requests
+
+from puter_http import iter_chat_chunks, read_chat_stream
+
+
+def make_response(body: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = content_type
+    response.raw = io.BytesIO(body)
+    # requests가 실제 응답에 적용하는 것과 같은 인코딩 (text/*에 charset이 없으면 ISO-8859-1)
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def sse_body(deltas) -> bytes:
+    events = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": delta}}]}, ensure_ascii=False) + "\n\n"
+        for delta in deltas
+    ]
+    return ("".join(events) + "data: [DONE]\n\n").encode("utf-8")
+
+
+def test_non_ascii_deltas_without_charset():
+    # 청크 경계가 여러 바이트 문자 중간에 걸리도록 충분히 길게 만듦
+    deltas = [f"안녕하세요 {i}번째 조각입니다. " for i in range(100)]
+    response = make_response(sse_body(deltas), "text/event-stream")
+
+    assert list(iter_chat_chunks(response)) == deltas
+
+
+def test_read_chat_stream_joins_chunks():
+    deltas = ["한", "글 ", "응답"]
+    chunks = []
+    text = read_chat_stream(make_response(sse_body(deltas), "text/event-stream"), chunks.append)
+
+    assert text == "한글 응답"
+    assert "".join(chunks) == text
+
+
+def test_plain_json_response():
+    body = json.dumps({"choices": [{"message": {"content": "전체 응답"}}]}).encode("utf-8")
+    response = make_response(body, "application/json")
+
+    assert list(iter_chat_chunks(response)) == ["전체 응답"]